@@ -0,0 +1,268 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# An asyncio version of Fiend, for keeping many accounts in sync from one event
+# loop. It only replaces the network calls: the games are parsed, replayed and
+# merged by the same code as Fiend. This module needs Python 3.5 or later.
+#
+# Requests go through an async transport, which is any object with a
+# coroutine request(url, headers, timeout) that returns a (response, content)
+# pair like httplib2 does. AsyncTransport is a small HTTP/1.1 client built on
+# asyncio streams that keeps connections alive and limits how many requests
+# are in flight at once.
+
+import asyncio
+import ssl
+from urllib.parse import urlsplit
+from fiend import Fiend, GAMES_SINCE_START
+from instrument import clock
+from transport import DEFAULT_MAX_CONNECTIONS, DEFAULT_TIMEOUT
+
+class AsyncFiend(Fiend):
+    def __init__(self, login, password, transport=None, **kwargs):
+        '''
+        Takes the same params as Fiend, except that transport is an async
+        transport, such as an AsyncTransport. Several AsyncFiend objects can
+        share one, and its maxConnections then limits them all together. The
+        params after password are passed on to Fiend by name.
+        '''
+
+        if transport is None:
+            transport = AsyncTransport()
+
+        Fiend.__init__(self, login, password, transport=transport, **kwargs)
+
+    @property
+    def games(self):
+        '''
+        A dictionary of your games, with game IDs as the keys, and
+        Game objects as the values.
+
+        Unlike Fiend.games, this can't make server calls, so it's empty until
+        refreshGames() or syncGames() has been awaited. Saved games are loaded
+        from the store, if there is one.
+        '''
+
+        if not self._games and self.store is not None:
+            self._loadStore()
+
+        return self._games
+
+    async def refreshGames(self):
+        '''
+        The same as Fiend.refreshGames(), but awaitable.
+        '''
+
+        self._resetGames()
+        await self.syncGames()
+
+    async def syncGames(self, useLxml=None):
+        '''
+        The same as Fiend.syncGames(), but awaitable.
+        '''
+
+        if not self._games and self.store is not None:
+            self._loadStore()
+
+        source = await self._serverGet('games', self._gamesParams(self._gamesSince, self._movesSince), conditional=True)
+        if source is None:
+            return
+
+        try:
+            self._mergeGames(source, useLxml)
+        except BaseException:
+            self._validators.pop('games', None)
+            raise
+
+    async def iterGames(self, source=None, useLxml=None):
+        '''
+        The same as Fiend.iterGames(), but awaitable. Returns an iterator of
+        the games.
+        '''
+
+        if source is None:
+            source = await self._serverGet('games', self._gamesParams(GAMES_SINCE_START, 0))
+
+        return self._buildGames(source, useLxml)
+
+    async def _serverGet(self, call, params, timeout=None, conditional=False):
+        url, headers = self._request(call, params, conditional)
+        start = clock()
+        response, content = await self.transport.request(url, headers, timeout)
+
+        if self.instruments is not None:
+            self._recordCall(call, clock() - start, content)
+
+        return self._readResponse(call, url, response, content, conditional)
+
+    async def _serverGetMany(self, calls, timeout=None):
+        return await asyncio.gather(*[self._serverGet(call, params, timeout) for call, params in calls])
+
+class Response(dict):
+    '''
+    The headers of a response, with lowercase names, and its status and reason.
+    '''
+
+    def __init__(self, status, reason, headers):
+        dict.__init__(self, headers)
+        self.status = status
+        self.reason = reason
+
+class AsyncTransport(object):
+    def __init__(self, maxConnections=DEFAULT_MAX_CONNECTIONS, timeout=DEFAULT_TIMEOUT):
+        '''
+        Params:
+            maxConnections - The most requests that can be in flight at once.
+            timeout - The default timeout for a whole request, in seconds.
+        '''
+
+        self.maxConnections = maxConnections
+        self.timeout = timeout
+
+        # Open connections that aren't in use, by (scheme, host, port).
+        self._idle = {}
+        self._slots = None
+
+    async def request(self, url, headers=None, timeout=None):
+        '''
+        Makes a GET request and returns a (response, content) pair.
+        '''
+
+        # The semaphore is made here so that it belongs to the running loop.
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.maxConnections)
+
+        async with self._slots:
+            return await asyncio.wait_for(self._request(url, headers or {}),
+                                          self.timeout if timeout is None else timeout)
+
+    def close(self):
+        '''
+        Closes every idle connection.
+        '''
+
+        for connections in self._idle.values():
+            for reader, writer in connections:
+                writer.close()
+
+        self._idle = {}
+
+    async def _request(self, url, headers):
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+        path = (parts.path or '/') + ('?' + parts.query if parts.query else '')
+
+        lines = ['GET %s HTTP/1.1' % path, 'Host: %s' % parts.netloc]
+        lines.extend(['%s: %s' % (name, value) for name, value in headers.items()])
+        message = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+        idle = self._idle.setdefault(key, [])
+
+        while True:
+            reused = bool(idle)
+
+            if reused:
+                reader, writer = idle.pop()
+            else:
+                reader, writer = await asyncio.open_connection(
+                    key[1], key[2], ssl=ssl.create_default_context() if key[0] == 'https' else None)
+
+            try:
+                writer.write(message)
+                response, content, keepAlive = await _readResponse(reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+
+                # The server may have closed an idle connection, so that's
+                # retried on a new one.
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+
+            if keepAlive:
+                idle.append((reader, writer))
+            else:
+                writer.close()
+
+            return response, content
+
+async def _readResponse(reader):
+    # Interim responses, such as 100 Continue or 103 Early Hints, can come
+    # before the final one, and are skipped (RFC 7231 section 6.2). 101
+    # Switching Protocols is final, and the connection can't be used for HTTP
+    # after it.
+    while True:
+        version, status, reason, headers = await _readHead(reader)
+
+        if not 100 <= status < 200 or status == 101:
+            break
+
+    keepAlive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close' and status != 101
+
+    if 100 <= status < 200 or status in (204, 304):
+        # These never have a body, whatever the headers say (RFC 7230
+        # section 3.3.3), so reading one would wait on a kept alive
+        # connection until the request timed out.
+        content = b''
+    elif headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                # Skip any trailers
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                break
+
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+        content = b''.join(chunks)
+    elif 'content-length' in headers:
+        content = await reader.readexactly(int(headers['content-length']))
+    else:
+        content = await reader.read()
+        keepAlive = False
+
+    return Response(status, reason, headers), content, keepAlive
+
+async def _readHead(reader):
+    statusLine = (await reader.readline()).decode('latin-1')
+    if not statusLine:
+        raise ConnectionError('Connection closed before a response')
+
+    version, status, reason = (statusLine.rstrip('\r\n').split(' ', 2) + [''])[:3]
+
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode('latin-1').rstrip('\r\n')
+        if not line:
+            break
+
+        name, value = line.split(':', 1)
+        headers[name.strip().lower()] = value.strip()
+
+    return version, int(status), reason, headers
@@ -0,0 +1,232 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Times Fiend's hot paths on synthetic games from synthgames, and writes the
+# results as JSON so runs on different commits can be compared. The games
+# list is served by a local stand-in server for refreshGames(), so nothing
+# leaves the machine.
+#
+#     python benchmark.py --sizes 50,200,1000 --output results.json
+#
+# Each benchmark is run --repeats times at each size, and the fastest and
+# median times are reported, in seconds.
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import timeit
+
+try:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+try:
+    from subprocess import DEVNULL
+except ImportError:
+    DEVNULL = open(os.devnull, 'w')
+
+import fiend
+import mersenne
+import synthgames
+from fiend import Fiend, iterGameElements, renderBoardString, renderBoardGrid
+
+DEFAULT_SIZES = (50, 200, 1000)
+DEFAULT_REPEATS = 3
+DEFAULT_SEED = 1
+
+class StandInServer(ThreadingMixIn, HTTPServer):
+    '''
+    Serves the same content for every GET request, on a free local port.
+    '''
+
+    daemon_threads = True
+
+    def __init__(self, content):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), StandInHandler)
+        self.content = content
+        self.url = 'http://127.0.0.1:%d/' % self.server_address[1]
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/xml')
+        self.send_header('Content-Length', str(len(self.server.content)))
+        self.end_headers()
+        self.wfile.write(self.server.content)
+
+    def log_message(self, format, *args):
+        pass
+
+def runBenchmarks(sizes=DEFAULT_SIZES, repeats=DEFAULT_REPEATS, seed=DEFAULT_SEED, maxMoves=synthgames.DEFAULT_MAX_MOVES):
+    '''
+    Runs every benchmark at each size, which is a number of games, and
+    returns the results as a dictionary that can be written as JSON.
+    '''
+
+    results = []
+
+    for numGames in sizes:
+        content = synthgames.gamesXml(numGames, seed, maxMoves).encode('utf-8')
+
+        fiendObj = Fiend('benchmark@example.com', 'benchmark')
+        fiendObj._mergeGames(io.BytesIO(content))
+        games = list(fiendObj.games.values())
+        numMoves = sum([len(game.moves) for game in games])
+        rows = [(game.row, [user.row for user in (game.creator, game.opponent)], [move.row for move in game.moves])
+                for game in games]
+
+        def record(name, function):
+            times = timeit.repeat(function, number=1, repeat=repeats)
+            results.append({
+                'name':   name,
+                'games':  numGames,
+                'moves':  numMoves,
+                'best':   min(times),
+                'median': sorted(times)[len(times) // 2],
+                'times':  times
+            })
+
+        record('parse', lambda: _consume(iterGameElements(io.BytesIO(content), useLxml=False)))
+
+        if fiend.lxml is not None:
+            record('parseLxml', lambda: _consume(iterGameElements(io.BytesIO(content), useLxml=True)))
+
+        server = StandInServer(content)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        try:
+            fiendObj.url = server.url
+            record('refreshGames', fiendObj.refreshGames)
+        finally:
+            fiendObj.transport.close()
+            server.shutdown()
+            server.server_close()
+
+        record('replay', lambda: _replay(fiendObj, rows))
+
+        # Replaying at each of the lower validation levels, to compare with
+        # replay, which fully checks every move.
+        for name, level in [('replayChecksum', fiend.VALIDATE_CHECKSUM), ('replayTrusted', fiend.VALIDATE_TRUSTED)]:
+            parent = Fiend('benchmark@example.com', 'benchmark', transport=fiendObj.transport, validation=level)
+            record(name, lambda: _replay(parent, rows))
+
+        record('remainingLetterCodes', lambda: _remainingLetterCodes(games))
+        record('checksum', lambda: [game._calculateBoardChecksum() for game in games])
+        record('renderBoardString', lambda: [renderBoardString(game.board, game._blanks) for game in games])
+        record('renderBoardGrid', lambda: [renderBoardGrid(game.board, game._blanks) for game in games])
+        record('renderBoardsCached', lambda: fiendObj.renderBoards())
+
+        if tracemalloc is not None:
+            results.append({
+                'name':  'memory',
+                'games': numGames,
+                'moves': numMoves,
+                'bytes': _retainedBytes(content)
+            })
+
+    return {
+        'commit':   _commit(),
+        'python':   platform.python_version(),
+        'platform': platform.platform(),
+        'numpy':    mersenne.numpy is not None,
+        'lxml':     fiend.lxml is not None,
+        'seed':     seed,
+        'maxMoves': maxMoves,
+        'repeats':  repeats,
+        'results':  results
+    }
+
+def _consume(iterator):
+    for item in iterator:
+        pass
+
+def _replay(parent, rows):
+    for row, userRows, moveRows in rows:
+        game = Fiend.Game()
+        game.parent = parent
+        game.setWithRows(row, userRows, moveRows)
+
+def _remainingLetterCodes(games):
+    for game in games:
+        game._remainingLetterCodes = None
+        game.remainingLetterCodes
+
+def _retainedBytes(content):
+    # The memory still in use after the games have been built and replayed.
+    tracemalloc.start()
+    fiendObj = Fiend('benchmark@example.com', 'benchmark')
+
+    try:
+        fiendObj._mergeGames(io.BytesIO(content))
+        return tracemalloc.get_traced_memory()[0]
+    finally:
+        fiendObj.transport.close()
+        tracemalloc.stop()
+
+def _commit():
+    try:
+        output = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                         stderr=DEVNULL)
+        return output.decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Times Fiend's hot paths on synthetic games.")
+    parser.add_argument('--sizes', default=','.join([str(size) for size in DEFAULT_SIZES]),
+                        help='Comma separated numbers of games to run at.')
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS, help='How many times to run each benchmark.')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='The seed the games are generated from.')
+    parser.add_argument('--max-moves', type=int, default=synthgames.DEFAULT_MAX_MOVES, help='The most moves in a game.')
+    parser.add_argument('--output', help='A file to write the JSON to, instead of standard output.')
+    options = parser.parse_args(args)
+
+    sizes = [int(size) for size in options.sizes.split(',')]
+    report = runBenchmarks(sizes, options.repeats, options.seed, options.max_moves)
+    text = json.dumps(report, indent=2, sort_keys=True)
+
+    if options.output:
+        with open(options.output, 'w') as outputFile:
+            outputFile.write(text + '\n')
+    else:
+        sys.stdout.write(text + '\n')
+
+if __name__ == '__main__':
+    main()
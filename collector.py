@@ -0,0 +1,57 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# The base of the collections that moves are added to as they're replayed,
+# such as stats.MoveStats and wordindex.WordIndex. A game's moves can be
+# replayed more than once, such as when a game is loaded again from a store,
+# so the collector keeps track of how far it's got through each game and
+# skips the moves it's already seen.
+
+class MoveCollector(object):
+    def __init__(self):
+        # The number of moves collected from each game, by game ID.
+        self._numMoves = {}
+
+    def addGame(self, game):
+        '''
+        Adds every move of a game that hasn't been added already.
+        '''
+
+        for move in game.moves:
+            self.addMove(game, move)
+
+    def addMove(self, game, move):
+        '''
+        Adds a move that's been added to a game. Moves have to be added in
+        order, and a move that's already been added is ignored.
+        '''
+
+        if move.moveIndex < self._numMoves.get(game.id, 0):
+            return
+
+        self._numMoves[game.id] = move.moveIndex + 1
+        self._collect(game, move)
+
+    def _collect(self, game, move):
+        # Adds a move that hasn't been seen before. Subclasses do the work.
+        raise NotImplementedError
@@ -24,10 +24,25 @@
 VERSION = '0.3'
 
 import base64
+import calendar
 import copy
+from array import array
+import hashlib
+import re
 import xml.etree.ElementTree as etree
-import httplib2
+import gameboard
+import letterbag
 import mersenne
+from instrument import clock
+from transport import Transport, openContent
+
+# lxml can pick the <game> elements out of a games list faster than
+# ElementTree, so it's used for that when it's installed. Both give the same
+# results.
+try:
+    import lxml.etree
+except ImportError:
+    lxml = None
 
 # Device data required in the headers.
 USER_AGENT = 'WordsWithFriendsAndroid/3.51'
@@ -38,10 +53,31 @@ PLATFORM = 'android'
 # Main URL for all server requests.
 WWF_URL = 'https://wordswithfriends.zyngawithfriends.com/'
 
+# The earliest games_since value, which asks the server for every game.
+GAMES_SINCE_START = '1970-0-1T0:0:0-00:00'
+
+TIMESTAMP_PATTERN = re.compile(r'(\d+)-(\d+)-(\d+)T(\d+):(\d+):(\d+)(?:\.\d*)?(?:Z|([+-])(\d+):?(\d+))?$')
+
 GAME_OVER_BY_DECLINE = 97
 GAME_OVER_BY_NO_PLAY = 99
 GAME_OVER_BY_WIN = 100
 
+# How thoroughly moves are checked as they're replayed. VALIDATE_FULL makes
+# every check, VALIDATE_CHECKSUM only checks each move against the server's
+# board checksum, and VALIDATE_TRUSTED only makes the checks that replaying
+# needs, for games that have already been checked. A move that fails is rolled
+# back at every level.
+VALIDATE_FULL = 'full'
+VALIDATE_CHECKSUM = 'checksum'
+VALIDATE_TRUSTED = 'trusted'
+
+# The checks that each validation level skips.
+SKIPPED_CHECKS = {
+    VALIDATE_FULL:     (),
+    VALIDATE_CHECKSUM: ('moveIndex', 'promoted', 'overlap'),
+    VALIDATE_TRUSTED:  ('moveIndex', 'promoted', 'overlap', 'checksum')
+}
+
 # Letter distribution:
 # A-9 B-2 C-2 D-5 E-13 F-2 G-3 H-4 I-8 J-1 K-1 L-4 M-2
 # N-5 O-8 P-2 Q-1 R-6  S-5 T-7 U-4 V-2 W-2 X-1 Y-2 Z-1
@@ -104,8 +140,177 @@ BONUS_SQUARES = [['-', '-', '-', '$', '-', '-', '!', '-', '!', '-', '-', '$', '-
                  ['-', '-', '+', '-', '-', '=', '-', '-', '-', '=', '-', '-', '+', '-', '-'],
                  ['-', '-', '-', '$', '-', '-', '!', '-', '!', '-', '-', '$', '-', '-', '-']]
 
+# Lookup tables for scoring. CODE_VALUES is indexed by letter code, and the
+# multipliers are indexed the same way as a gameboard.Board's cells (x * 15 + y).
+CODE_VALUES = [LETTER_VALUES[letter] for letter in LETTER_MAP]
+LETTER_MULTIPLIERS = [{DOUBLE_LETTER: 2, TRIPLE_LETTER: 3}.get(square, 1) for column in BONUS_SQUARES for square in column]
+WORD_MULTIPLIERS = [{DOUBLE_WORD: 2, TRIPLE_WORD: 3}.get(square, 1) for column in BONUS_SQUARES for square in column]
+
+# How a '*' in a move's text, for a tile that's already on the board, is kept
+# in the move's tile codes.
+EXISTING_TILE = -1
+
+# The blanks of a move that doesn't play any, shared by all of those moves.
+NO_BLANKS = (None, None)
+
+# The fields of games, users and moves that come from the server, in the order
+# used by their row properties.
+GAME_ROW_FIELDS = ('id', 'currentMoveUserId', 'createdByUserId', 'chatSessionId',
+                   'isMatchmaking', 'wasMatchmaking', 'movesCount', 'moveCount',
+                   'randomSeed', 'clientVersion', 'observers', 'createdAt')
+USER_ROW_FIELDS = ('id', 'name')
+MOVE_ROW_FIELDS = ('id', 'gameId', 'userId', 'fromX', 'fromY', 'toX', 'toY',
+                   'moveIndex', 'text', 'createdAt', 'promoted', 'boardChecksum')
+
+# The fields of moves that are worked out by replaying them, in the order used
+# by Move.resultRow.
+MOVE_RESULT_FIELDS = ('score', 'words', 'drawCount')
+
+def parseTimestamp(timestamp):
+    '''
+    Returns the number of seconds since the epoch for a server timestamp,
+    such as 2011-01-01T00:00:00Z or 2011-01-01T00:00:00-07:00, or 0 if it
+    can't be read.
+    '''
+
+    match = TIMESTAMP_PATTERN.match(timestamp or '')
+    if match is None:
+        return 0
+
+    year, month, day, hour, minute, second = [int(part) for part in match.groups()[:6]]
+
+    try:
+        seconds = calendar.timegm((year, month, day, hour, minute, second, 0, 0, 0))
+    except ValueError:
+        return 0
+
+    if match.group(7):
+        offset = int(match.group(8)) * 3600 + int(match.group(9)) * 60
+        seconds += -offset if match.group(7) == '+' else offset
+
+    return seconds
+
+def _checkValidation(level):
+    if level not in SKIPPED_CHECKS:
+        raise ValueError('Unknown validation level: ' + repr(level))
+
+def renderBoardString(board, blanks):
+    '''
+    Returns a 15x15 text grid of a gameboard.Board, the same as Game.boardString.
+    Only the occupied cells are filled in on a copy of the empty board.
+    '''
+
+    output = BOARD_STRING_TEMPLATE[:]
+
+    for i, code in enumerate(board.cells):
+        if code != -1:
+            output[BOARD_STRING_OFFSETS[i]] = blanks[code] if code == 0 or code == 1 else LETTER_MAP[code]
+
+    return ''.join(output)
+
+def renderBoardGrid(board, blanks):
+    '''
+    Returns the board drawn with lines and colors, the same as Game.boardGrid.
+    '''
+
+    output = BOARD_GRID_TEMPLATE[:]
+
+    for i, code in enumerate(board.cells):
+        if code != -1:
+            letter = blanks[code] if code == 0 or code == 1 else LETTER_MAP[code]
+            output[BOARD_GRID_OFFSETS[i]] = ' ' + GRID_BOLD + letter + GRID_RESET + ' ' + GRID_OUTLINE + '|' + GRID_RESET
+
+    return ''.join(output)
+
+def _boardStringTemplate():
+    template = []
+    offsets = [0] * (15 * 15)
+
+    for y in range(15):
+        for x in range(15):
+            offsets[x * 15 + y] = len(template)
+            template.append(BONUS_SQUARES[x][y])
+
+        template.append('\n')
+
+    return template, offsets
+
+def _boardGridTemplate():
+    template = [GRID_OUTLINE + '   ' + ('+---'*15) + '+\n' + GRID_RESET]
+    offsets = [0] * (15 * 15)
+    legend = {0: TRIPLE_WORD + ' Triple Word', 1: TRIPLE_LETTER + ' Triple Letter',
+              2: DOUBLE_WORD + ' Double Word', 3: DOUBLE_LETTER + ' Double Letter'}
+
+    for y in range(15):
+        template.append((' ' if 14 - y < 10 else '') + str(14 - y) + ' ' + GRID_OUTLINE + '|' + GRID_RESET)
+
+        for x in range(15):
+            square = ' ' if BONUS_SQUARES[x][y] == '-' else BONUS_SQUARES[x][y]
+            offsets[x * 15 + y] = len(template)
+            template.append(' ' + square + ' ' + GRID_OUTLINE + '|' + GRID_RESET)
+
+        if y in legend:
+            template.append('    ' + legend[y])
+
+        template.append(GRID_OUTLINE + '\n   ' + ('+---'*15) + '+\n' + GRID_RESET)
+
+    template.append('     ' + '   '.join([str(x) for x in range(10)]))
+    template.append('   ' + '  '.join([str(x) for x in range(10,15)]))
+    template.append('\n')
+
+    return template, offsets
+
+# The empty board for boardString and boardGrid, as lists with one item for
+# each cell and one for each piece between them. The offsets are where each
+# cell's item is, indexed the same way as a gameboard.Board's cells.
+GRID_BOLD = '\033[1;31m'
+GRID_OUTLINE = '\033[0;37m'
+GRID_RESET = '\033[0;0m'
+BOARD_STRING_TEMPLATE, BOARD_STRING_OFFSETS = _boardStringTemplate()
+BOARD_GRID_TEMPLATE, BOARD_GRID_OFFSETS = _boardGridTemplate()
+
+def iterGameElements(source, useLxml=None):
+    '''
+    Reads a games list from the file-like object source and yields each <game>
+    element as soon as it's closed. Each element is removed from the tree once
+    the next one is asked for.
+
+    useLxml picks the parser. Defaults to lxml if it's installed.
+    '''
+
+    if useLxml is None:
+        useLxml = lxml is not None
+
+    if useLxml:
+        for event, elem in lxml.etree.iterparse(source, tag='game'):
+            root = elem.getparent()
+
+            if root is not None and root.getparent() is None:
+                yield elem
+                elem.clear()
+                root.remove(elem)
+
+        return
+
+    depth = 0
+    root = None
+
+    for event, elem in etree.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = elem
+            depth += 1
+            continue
+
+        depth -= 1
+
+        if depth == 1 and elem.tag == 'game':
+            yield elem
+            elem.clear()
+            root.remove(elem)
+
 class Fiend(object):
-    def __init__(self, login, password, userAgent=USER_AGENT, deviceOs=DEVICE_OS, deviceId=DEVICE_ID, platform=PLATFORM):
+    def __init__(self, login, password, userAgent=USER_AGENT, deviceOs=DEVICE_OS, deviceId=DEVICE_ID, platform=PLATFORM, store=None, transport=None, url=WWF_URL, compress=False, lazy=False, stats=None, wordIndex=None, instruments=None, validation=VALIDATE_FULL):
         '''
         Params:
             login - Your Words with Friends login email address.
@@ -113,6 +318,33 @@ class Fiend(object):
             userAgent - The string sent in the User-Agent header.
             deviceOs - The string set in the Device-OS header.
             deviceId - The string set in the Device-Id header.
+            store - An optional store.GameStore. Games are loaded from it the first
+                    time they're needed, only changes are asked for from the server,
+                    and every sync is saved back to it.
+            transport - The transport.Transport to make requests with. Several Fiend
+                        objects can share one. A new one is made if it's not given.
+            url - The URL that server calls are made to.
+            compress - Whether to ask the server for gzip or deflate compressed
+                       responses. They're decompressed as they're parsed.
+            lazy - Whether games should put off replaying their moves until
+                   something that depends on them is first used, such as a
+                   game's board or moves, or a player's rack or score.
+                   Listing games and their users is then cheap, and so is
+                   gameOver, which is read from the moves without replaying
+                   them. With a store, synced games are saved from their moves'
+                   rows, so saving doesn't replay them either. Moves are
+                   replayed straight away anyway if there are stats or a
+                   wordIndex, since those are built from the moves' results,
+                   unless the results were loaded from the store.
+            stats - An optional stats.MoveStats that every move is added to as
+                    it's replayed.
+            wordIndex - An optional wordindex.WordIndex that the words of every
+                        move are added to as it's replayed.
+            instruments - An optional instrument.Instruments that records counts
+                          and timings of server calls, parsing and replay.
+            validation - How thoroughly moves are checked as they're replayed:
+                         VALIDATE_FULL, VALIDATE_CHECKSUM or VALIDATE_TRUSTED.
+                         Games can override it with their validation attribute.
         '''
 
         self.login = login
@@ -121,17 +353,59 @@ class Fiend(object):
         self.deviceOs = deviceOs
         self.deviceId = deviceId
         self.platform = platform
+        self.url = url
+        self.lazy = lazy
+        self.stats = stats
+        self.wordIndex = wordIndex
+        self.instruments = instruments
+        self.validation = validation
 
         self.userId = None
         self.userName = None
         self.userEmail = None
 
-        self.authorization = base64.b64encode(self.login + ':' + self.password) 
+        self.authorization = base64.b64encode((self.login + ':' + self.password).encode('utf-8')).decode('ascii')
 
-        self._http = httplib2.Http();
+        self.transport = transport if transport is not None else Transport()
+
+        # The headers are the same for every call, so they're only built once.
+        self._headers = {
+            'User-Agent':    self.userAgent,
+            'Content-Type':  'application/xml',
+            'Authorization': self.authorization,
+            'Device-OS':     self.deviceOs,
+            'Device-Id':     self.deviceId,
+            'Accept':        'text/xml',
+            'Cache-Control': 'no-cache',
+            'Pragma':        'no-cache'
+        }
+
+        if compress:
+            self._headers['Accept-Encoding'] = 'gzip, deflate'
+
+        # The URL, ETag, Last-Modified and content hash of the last response to
+        # each conditional call. A call to the same URL asks the server whether
+        # anything has changed, and gets no content if nothing has.
+        self._validators = {}
 
         self._games = {}
 
+        # The newest game or move time and the highest move ID seen so far,
+        # which syncGames() sends as games_since and moves_since.
+        self._gamesSince = GAMES_SINCE_START
+        self._movesSince = 0
+
+        self.store = store
+
+    @property
+    def validation(self):
+        return self._validation
+
+    @validation.setter
+    def validation(self, value):
+        _checkValidation(value)
+        self._validation = value
+
     @property
     def games(self):
         '''
@@ -143,10 +417,31 @@ class Fiend(object):
         '''
 
         if not self._games:
-            self.refreshGames()
+            if self.store is not None:
+                self._loadStore()
+                self.syncGames()
+            else:
+                self.refreshGames()
 
         return self._games
 
+    def renderBoards(self, gameIds=None, grid=False):
+        '''
+        Returns a dictionary with game IDs as the keys, and each game's
+        boardString as the values, or its boardGrid if grid is True.
+
+        Params:
+            gameIds - The IDs of the games to render. Defaults to all of them.
+            grid - Whether to render boardGrid rather than boardString.
+        '''
+
+        if gameIds is None:
+            gameIds = list(self.games.keys())
+
+        name = 'boardGrid' if grid else 'boardString'
+        render = renderBoardGrid if grid else renderBoardString
+        return dict([(gameId, self.games[gameId]._render(name, render)) for gameId in gameIds])
+
     @property
     def activeGames(self):
         activeGames = {}
@@ -157,6 +452,39 @@ class Fiend(object):
 
         return activeGames
 
+    @property
+    def opponentMoveGames(self):
+        '''
+        A dictionary of the active games where it's another player's move,
+        going by their currentMoveUserId. Unlike activeGames, this never makes
+        a server call, and it's empty until the games have been loaded.
+        '''
+
+        opponentMoveGames = {}
+
+        for id, game in self._games.items():
+            if not game.gameOver and game.currentMoveUserId is not None and game.currentMoveUserId != self.userId:
+                opponentMoveGames[id] = game
+
+        return opponentMoveGames
+
+    @property
+    def skippedChecks(self):
+        '''
+        A dictionary with the names of the checks that were skipped while
+        replaying the games, and the number of moves each was skipped for,
+        added up across all of the games. Like opponentMoveGames, it never
+        makes a server call.
+        '''
+
+        skippedChecks = {}
+
+        for game in self._games.values():
+            for check, count in game.skippedChecks.items():
+                skippedChecks[check] = skippedChecks.get(check, 0) + count
+
+        return skippedChecks
+
     def refreshGames(self):
         '''
         Makes a call to the server to retrieve a list of your games. It sets
@@ -164,49 +492,250 @@ class Fiend(object):
         Game objects as the values.
         '''
 
+        self._resetGames()
+        self.syncGames()
+
+    def syncGames(self, useLxml=None):
+        '''
+        Makes a call to the server for only the games and moves that have changed
+        since the last refreshGames() or syncGames(), and merges them into the
+        games property. New moves are added to the existing Game objects, and
+        games that haven't changed are left alone.
+
+        If the server says nothing has changed since the last sync, or sends
+        back exactly the same content, nothing is parsed or replayed.
+        '''
+
+        source = self._serverGet('games', self._gamesParams(self._gamesSince, self._movesSince), conditional=True)
+        if source is None:
+            return
+
+        try:
+            self._mergeGames(source, useLxml)
+        except BaseException:
+            # The same response has to be merged again next time, rather
+            # than being skipped as unchanged.
+            self._validators.pop('games', None)
+            raise
+
+    def iterGames(self, source=None, useLxml=None):
+        '''
+        Yields a Game object for each of your games. Each game is built and has
+        its moves replayed as soon as its XML has been read, and the XML is
+        thrown away after that, so the whole list is never in memory at once.
+        This doesn't change the games property.
+
+        Params:
+            source - A file-like object to read the games list from. If it's
+                     not given, the list is retrieved from the server.
+            useLxml - Whether to parse with lxml. Defaults to using it if it's
+                      installed, and ElementTree otherwise.
+        '''
+
+        if source is None:
+            source = self._serverGet('games', self._gamesParams(GAMES_SINCE_START, 0))
+
+        return self._buildGames(source, useLxml)
+
+    def _resetGames(self):
         self._games = {}
+        self._gamesSince = GAMES_SINCE_START
+        self._movesSince = 0
+        self._validators = {}
 
-        params = {
+    def _buildGames(self, source, useLxml=None):
+        for gameXml in self._iterGameElements(source, useLxml):
+            gameObj = Fiend.Game()
+            gameObj.parent = self
+            self._timed('build', gameObj.setWithXml, gameXml)
+
+            yield gameObj
+
+    def _mergeGames(self, source, useLxml=None):
+        # The watermarks only move once the whole response has merged. If a
+        # game fails part way through, they're left where they were, so that
+        # game and the ones after it are asked for again next time. They're
+        # compared as times, since the server's timestamps can have different
+        # UTC offsets.
+        gamesSince = self._gamesSince
+        gamesSinceTime = parseTimestamp(gamesSince)
+        movesSince = self._movesSince
+
+        for gameXml in self._iterGameElements(source, useLxml):
+            gameId = int(gameXml.findtext('id'))
+
+            if gameId in self._games:
+                gameObj = self._games[gameId]
+                self._timed('build', gameObj.mergeWithXml, gameXml)
+            else:
+                gameObj = Fiend.Game()
+                gameObj.parent = self
+                self._timed('build', gameObj.setWithXml, gameXml)
+
+                self._games[gameObj.id] = gameObj
+
+            # All of the game's moves are counted, not just the new ones, since
+            # a game that merged before a failure won't have new ones when
+            # it's sent again. They're read without replaying them, in case
+            # they're lazy.
+            moves = gameObj._moves + gameObj._pendingMoves
+
+            for createdAt in [gameObj.createdAt] + [moveObj.createdAt for moveObj in moves]:
+                createdAtTime = parseTimestamp(createdAt)
+                if createdAtTime > gamesSinceTime:
+                    gamesSince = createdAt
+                    gamesSinceTime = createdAtTime
+
+            for moveObj in moves:
+                movesSince = max(movesSince, moveObj.id)
+
+            if self.store is not None:
+                self._timed('store', self.store.saveGame, gameObj)
+
+        self._gamesSince = gamesSince
+        self._movesSince = movesSince
+
+        if self.store is not None:
+            self._saveStoreMeta()
+            self._timed('store', self.store.commit)
+
+    def _iterGameElements(self, source, useLxml):
+        gameElements = iterGameElements(source, useLxml)
+
+        if self.instruments is not None:
+            return self.instruments.timedIter('parse', gameElements)
+
+        return gameElements
+
+    def _timed(self, name, function, *args):
+        if self.instruments is None:
+            return function(*args)
+
+        return self.instruments.timed(name, function, *args)
+
+    def _loadStore(self):
+        self.userId = self.store.getMeta('userId', self.userId)
+        self.userName = self.store.getMeta('userName', self.userName)
+        self.userEmail = self.store.getMeta('userEmail', self.userEmail)
+        self._gamesSince = self.store.getMeta('gamesSince', GAMES_SINCE_START)
+        self._movesSince = self.store.getMeta('movesSince', 0)
+
+        self._games = self.store.loadGames(self)
+
+    def _saveStoreMeta(self):
+        self.store.setMeta('userId', self.userId)
+        self.store.setMeta('userName', self.userName)
+        self.store.setMeta('userEmail', self.userEmail)
+        self.store.setMeta('gamesSince', self._gamesSince)
+        self.store.setMeta('movesSince', self._movesSince)
+
+    def _gamesParams(self, gamesSince, movesSince):
+        return {
             'game_type':           'WordGame',
             'include_invitations': 'true',
-            'games_since':         '1970-0-1T0:0:0-00:00',
-            'moves_since':         '0',
+            'games_since':         gamesSince,
+            'moves_since':         str(movesSince),
             'chat_messages_since': '0',
             'get_current_user':    'true'
         }
 
-        gamesXml = etree.fromstring(self._serverGet('games', params))
+    def _serverGet(self, call, params, timeout=None, conditional=False):
+        '''
+        Makes a server call and returns a file-like object to read its content
+        from. If conditional is True, None is returned when the content hasn't
+        changed since the last conditional call with the same params.
+
+        Only the validators for the last params of each call are kept, along
+        with its URL, and they're only sent when the URL is the same. Params
+        like games_since only move forward, so a call never goes back to its
+        older params, and keeping those would only grow with every sync.
+        '''
+
+        url, headers = self._request(call, params, conditional)
 
-        for gameXml in gamesXml:
-            gameObj = Fiend.Game()
-            gameObj.parent = self
-            gameObj.setWithXml(gameXml)
-            
-            self._games[gameObj.id] = gameObj
+        if self.instruments is None:
+            response, content = self.transport.request(url, headers, timeout)
+        else:
+            start = clock()
+            response, content = self.transport.request(url, headers, timeout)
+            self._recordCall(call, clock() - start, content)
+
+        return self._readResponse(call, url, response, content, conditional)
+
+    def _serverGetMany(self, calls, timeout=None):
+        '''
+        Makes several server calls at once. calls is a list of (call, params)
+        pairs, and a file-like object for the content of each is returned in
+        the same order.
+        '''
+
+        requests = [self._request(call, params, False) for call, params in calls]
+        start = clock()
+        responses = self.transport.requestMany(requests, timeout)
+
+        # The calls run at the same time, so each is recorded as taking as
+        # long as all of them.
+        if self.instruments is not None:
+            seconds = clock() - start
+
+            for (call, params), (response, content) in zip(calls, responses):
+                self._recordCall(call, seconds, content)
 
-    def _serverGet(self, call, params):
+        return [self._readResponse(call, url, response, content, False)
+                for (call, params), (url, headers), (response, content) in zip(calls, requests, responses)]
+
+    def _recordCall(self, call, seconds, content):
+        self.instruments.record('network', seconds, len(content))
+        self.instruments.record('network.' + call, seconds, len(content))
+
+    def _request(self, call, params, conditional):
         url = self._makeUrl(call, params)
-        headers = {
-            'User-Agent':    USER_AGENT,
-            'Content-Type':  'application/xml',
-            'Authorization': self.authorization,
-            'Device-OS':     self.deviceOs,
-            'Device-Id':     self.deviceId,
-            'Accept':        'text/xml',
-            'Cache-Control': 'no-cache',
-            'Pragma':        'no-cache'
-        }
+        headers = self._headers
+        validator = self._validators.get(call) if conditional else None
+
+        if validator is not None and validator[0] == url:
+            headers = dict(headers)
+
+            if validator[1] is not None:
+                headers['If-None-Match'] = validator[1]
+            if validator[2] is not None:
+                headers['If-Modified-Since'] = validator[2]
+
+        return url, headers
+
+    def _readResponse(self, call, url, response, content, conditional):
+        if conditional and response.status == 304:
+            return None
+
+        if not 200 <= response.status < 300:
+            raise Fiend.ServerError('Server call failed: %d %s' % (response.status, response.reason), call, response.status)
 
-        # TODO: Check response to make sure all is well
-        response, content = self._http.request(url, headers=headers)
-        return content
+        if conditional:
+            digest = hashlib.sha1(content).hexdigest()
+            validator = self._validators.get(call)
+            self._validators[call] = (url, response.get('etag'), response.get('last-modified'), digest)
+
+            if validator is not None and validator[0] == url and validator[3] == digest:
+                return None
+
+        return openContent(response, content)
 
     def _makeUrl(self, call, params):
-        url = WWF_URL + call + '?'
+        url = self.url + call + '?'
         url += '&'.join([str(k) + '=' + str(v) for k, v in params.items()])
         return url
 
     class Game(object):
+        # Slots rather than an instance dict, since an account can have
+        # thousands of games, and far more users and moves.
+        __slots__ = ('id', 'parent', 'currentMoveUserId', 'createdByUserId', 'chatSessionId',
+                     'isMatchmaking', 'wasMatchmaking', 'movesCount', 'moveCount',
+                     'clientVersion', 'observers', 'createdAt', 'creator', 'opponent', 'player',
+                     '_boardChecksum', '_blanks', '_letterBag', '_randomSeed', '_random',
+                     '_drawCount', '_remainingLetterCodes', '_board', '_moves', '_gameOver',
+                     '_pendingMoves', '_renderCache', 'forkedFrom', '_validation',
+                     '_levelCounts')
+
         def __init__(self):
             self.id = None
             self.parent = None
@@ -220,19 +749,40 @@ class Fiend(object):
             self.clientVersion = None
             self.observers = None
             self.createdAt = None
-            self.boardChecksum = 0
+            self._boardChecksum = 0
 
             self._blanks = [None, None]
-            self.letterBagCodes = [i for i in range(len(LETTER_MAP))]
+            self._letterBag = letterbag.LetterBag(range(len(LETTER_MAP)))
             self._randomSeed = None
             self._random = None
+            self._drawCount = 0
+            self._remainingLetterCodes = None
 
-            self.board = self._initBoard()
+            self._board = self._initBoard()
             self.creator = Fiend.User()
+            self.creator._game = self
             self.opponent = Fiend.User()
+            self.opponent._game = self
             self.player = None
-            self.moves = []
-            self.gameOver = False
+            self._moves = []
+            self._gameOver = False
+
+            # Moves that have been read but not replayed yet, when the parent
+            # Fiend is lazy.
+            self._pendingMoves = []
+
+            # The last rendering of the board by each of boardString and
+            # boardGrid, with the board checksum and move count it was for.
+            self._renderCache = None
+
+            # The game this one is a fork of, or None.
+            self.forkedFrom = None
+
+            # The validation level for this game's moves, or None to use the
+            # parent Fiend's, and how many moves were replayed at each level
+            # below VALIDATE_FULL.
+            self._validation = None
+            self._levelCounts = {}
 
         def setWithXml(self, xmlElem):
             self.id = int(xmlElem.findtext('id'))
@@ -251,7 +801,7 @@ class Fiend(object):
             self.observers = str(xmlElem.findtext('observers'))
             self.createdAt = str(xmlElem.findtext('created-at'))
 
-            if self.parent.userId is None and xmlElem.find('current-user') is not None:
+            if self.parent is not None and self.parent.userId is None and xmlElem.find('current-user') is not None:
                 currentUserXmlElem = xmlElem.find('current-user')
                 self.parent.userId = int(currentUserXmlElem.findtext('id'))
                 self.parent.userName = str(currentUserXmlElem.findtext('name'))
@@ -261,71 +811,179 @@ class Fiend(object):
             self._processMoves(xmlElem.find('moves'))
 
         @property
-        def boardString(self):
+        def row(self):
             '''
-            Returns a 15x15 text grid of the game board.
+            The game's server data as a plain tuple, in the order of GAME_ROW_FIELDS.
             '''
 
-            board = '';
+            return tuple([getattr(self, field) for field in GAME_ROW_FIELDS])
 
-            for y in range(15):
-                for x in range(15):
-                    if self.board[x][y] == -1:
-                        board += BONUS_SQUARES[x][y]
-                    elif self.board[x][y] == 0 or self.board[x][y] == 1:
-                        board += self._blanks[self.board[x][y]]
-                    else:
-                        board += LETTER_MAP[self.board[x][y]]
+        def setWithRows(self, row, userRows, moveRows, lazy=False):
+            '''
+            Sets the game from the row of a Game, the rows of its Users and the
+            rows of its Moves, like setWithXml() does from the server's XML.
+
+            Params:
+                lazy - Whether to put off replaying the moves until something
+                       depends on them, as if the parent Fiend were lazy.
+            '''
+
+            for field, value in zip(GAME_ROW_FIELDS, row):
+                setattr(self, field, value)
+
+            for userRow in userRows:
+                userObj = Fiend.User()
+                userObj.setWithRow(userRow)
+                self._addUser(userObj)
+
+            moveList = []
+            for moveRow in moveRows:
+                moveObj = Fiend.Move()
+                moveObj.setWithRow(moveRow)
+                moveList.append(moveObj)
+
+            self._addMoves(moveList, lazy)
+
+        def mergeWithXml(self, xmlElem):
+            '''
+            Updates a game that's already been set with the XML of a newer
+            version of it. Only moves that come after the game's existing
+            moves are added, and only users that the game doesn't have yet,
+            such as the opponent of an invitation once they've joined.
+            '''
+
+            if xmlElem.findtext('current-move-user-id'):
+                self.currentMoveUserId = int(xmlElem.findtext('current-move-user-id'))
+
+            self.movesCount = int(xmlElem.findtext('moves-count'))
+            self.moveCount = int(xmlElem.findtext('move_count'))
 
-                board += '\n'
+            self._processUsers(xmlElem.find('users'), [self.creator.id, self.opponent.id])
+            self._processMoves(xmlElem.find('moves'))
 
-            return board
+        @property
+        def board(self):
+            self._replayMoves()
+            return self._board
 
         @property
-        def boardGrid(self):
-            boldLetter = '\033[1;31m'
-            outline = '\033[0;37m'
-            reset = '\033[0;0m'
-            
-            board = outline + '   ' + ('+---'*15) + '+\n' + reset
+        def moves(self):
+            self._replayMoves()
+            return self._moves
 
-            for y in range(15):
-                if 14 - y < 10:
-                    board += ' '
+        @property
+        def boardChecksum(self):
+            self._replayMoves()
+            return self._boardChecksum
 
-                board += str(14 - y) + ' ' + outline + '|' + reset
+        @property
+        def moveRows(self):
+            '''
+            The rows of the game's moves, in order. They're read without
+            replaying the moves, so this is cheap for lazy games.
+            '''
 
-                for x in range(15):
-                    board += ' '
-
-                    if self.board[x][y] == -1:
-                        if BONUS_SQUARES[x][y] == '-':
-                            board += ' '
-                        else:
-                            board += BONUS_SQUARES[x][y]
-                    elif self.board[x][y] == 0 or self.board[x][y] == 1:
-                        board += boldLetter + self._blanks[self.board[x][y]] + reset
-                    else:
-                        board += boldLetter + LETTER_MAP[self.board[x][y]] + reset
+            return [moveObj.row for moveObj in self._moves + self._pendingMoves]
+
+        @property
+        def moveResultRows(self):
+            '''
+            The result rows of the game's moves, in the same order as moveRows.
+            Moves that haven't been replayed, and whose results weren't loaded
+            with them, have a row of Nones.
+            '''
+
+            return [moveObj.resultRow for moveObj in self._moves + self._pendingMoves]
+
+        @property
+        def validation(self):
+            '''
+            The validation level for this game's moves, or None to use the
+            parent Fiend's.
+            '''
+
+            return self._validation
+
+        @validation.setter
+        def validation(self, value):
+            if value is not None:
+                _checkValidation(value)
+
+            self._validation = value
+
+        @property
+        def validationLevel(self):
+            '''
+            The validation level that moves are replayed with: the game's
+            validation if it's set, then the parent Fiend's, then VALIDATE_FULL.
+            '''
+
+            if self._validation is not None:
+                return self._validation
+
+            if self.parent is not None:
+                return self.parent.validation
+
+            return VALIDATE_FULL
+
+        @property
+        def skippedChecks(self):
+            '''
+            A dictionary with the names of the checks that the validation level
+            skipped as the keys, and the number of moves they were skipped for
+            as the values. It's empty if every move was fully checked.
+            '''
+
+            self._replayMoves()
+
+            skippedChecks = {}
+
+            for level, count in self._levelCounts.items():
+                for check in SKIPPED_CHECKS[level]:
+                    skippedChecks[check] = skippedChecks.get(check, 0) + count
+
+            return skippedChecks
 
-                    board += ' ' + outline + '|' + reset
+        @property
+        def gameOver(self):
+            '''
+            False, or the fromX of the move that ended the game. This is read
+            from the moves without replaying them, so it's cheap for lazy games.
+            '''
 
-                if y == 0:
-                    board += '    ' + TRIPLE_WORD + ' Triple Word'
-                elif y == 1:
-                    board += '    ' + TRIPLE_LETTER + ' Triple Letter'
-                elif y == 2:
-                    board += '    ' + DOUBLE_WORD + ' Double Word'
-                elif y == 3:
-                    board += '    ' + DOUBLE_LETTER + ' Double Letter'
+            if not self._gameOver:
+                for moveObj in self._pendingMoves:
+                    if GAME_OVER_BY_DECLINE <= moveObj.fromX <= GAME_OVER_BY_WIN:
+                        return moveObj.fromX
 
-                board += outline + '\n   ' + ('+---'*15) + '+\n' + reset
+            return self._gameOver
 
-            board += '     ' + '   '.join([str(x) for x in range(10)])
-            board += '   ' + '  '.join([str(x) for x in range(10,15)])
-            board += '\n'
+        @property
+        def boardString(self):
+            '''
+            Returns a 15x15 text grid of the game board.
 
-            return board
+            The text is kept until the board changes, so it's only rendered
+            again after a move has been added.
+            '''
+
+            return self._render('boardString', renderBoardString)
+
+        @property
+        def boardGrid(self):
+            return self._render('boardGrid', renderBoardGrid)
+
+        def _render(self, name, render):
+            key = (self.boardChecksum, len(self.moves))
+
+            if self._renderCache is None:
+                self._renderCache = {}
+
+            cached = self._renderCache.get(name)
+            if cached is None or cached[0] != key:
+                cached = self._renderCache[name] = (key, render(self.board, self._blanks))
+
+            return cached[1]
 
         @property
         def randomSeed(self):
@@ -341,11 +999,58 @@ class Fiend(object):
                 self._random = mersenne.Mersenne(self._randomSeed)
                 self._assignInitialTiles()
 
+        def randomAt(self, moveIndex=None):
+            '''
+            Returns a new Mersenne generator in the state this game's generator
+            was in right after the given move was added, or right after the
+            initial tiles were drawn if moveIndex is None. The generator is
+            skipped ahead to the move's drawCount instead of replaying it.
+            '''
+
+            if self.randomSeed is None:
+                raise Fiend.GameError('Game does not have a randomSeed', self)
+
+            if moveIndex is None:
+                # The two initial racks of 7 tiles.
+                drawCount = 14
+            else:
+                # A move's drawCount can be loaded with it, and then the moves
+                # don't have to be replayed to find it.
+                drawCount = (self._moves + self._pendingMoves)[moveIndex].drawCount
+
+                if drawCount is None:
+                    drawCount = self.moves[moveIndex].drawCount
+
+            random = mersenne.Mersenne(self.randomSeed)
+            random.skip(drawCount)
+            return random
+
+        @property
+        def letterBag(self):
+            self._replayMoves()
+            return self._letterBag
+
+        @property
+        def letterBagCodes(self):
+            return list(self.letterBag)
+
         @property
         def remainingLetterCodes(self):
-            random = copy.deepcopy(self._random)
-            letterBagCodes = copy.deepcopy(self.letterBagCodes)
-            return self._drawFromLetterBag(len(letterBagCodes), random, letterBagCodes)
+            '''
+            The codes left in the letter bag, in the order they'll be drawn.
+
+            This is worked out once and then kept up to date as tiles are drawn.
+            It's only worked out again after tiles are put back in the bag.
+            '''
+
+            self._replayMoves()
+
+            if self._remainingLetterCodes is None:
+                random = copy.copy(self._random)
+                letterBag = copy.copy(self.letterBag)
+                self._remainingLetterCodes = self._drawFromLetterBag(len(letterBag), random, letterBag)
+
+            return self._remainingLetterCodes[:]
 
         @property
         def remainingLetters(self):
@@ -357,31 +1062,44 @@ class Fiend(object):
             the Game's board.
             '''
 
+            instruments = self.parent.instruments if self.parent is not None else None
+
+            if instruments is None:
+                self._addMove(move)
+            else:
+                instruments.timed('replay', self._addMove, move)
+
+        def _addMove(self, move):
+            self._replayMoves()
+
             if self.gameOver:
                 raise Fiend.MoveError('Moves cannot be added to an ended game', move, self)
 
             if self.randomSeed is None:
                 raise Fiend.GameError('Game does not have a randomSeed', self)
 
+            level = self.validationLevel
+
             # moveIndex is 0-indexed
             nextMoveIndex = len(self.moves)
             if move.moveIndex is None:
                 move.moveIndex = nextMoveIndex
-            elif move.moveIndex != nextMoveIndex:
+            elif move.moveIndex != nextMoveIndex and level == VALIDATE_FULL:
                 raise Fiend.MoveError("The moveIndex is not next in this game's sequence", move, self)
 
-            numLettersPlayed, wordPoints, wordsPlayed, passedTurn = self._updateBoard(move)
+            numLettersPlayed, wordPoints, wordsPlayed, passedTurn = self._updateBoard(move, level)
 
             currentPlayer = self.creator if move.userId == self.creator.id else self.opponent
 
             currentPlayer.score += wordPoints
             currentPlayer.rack.extend(self._drawFromLetterBag(numLettersPlayed))
 
-            for tile in [a for a in move.textCodes if a != '*']:
+            for tile in [code for code in move._tileCodes if code != EXISTING_TILE]:
                 currentPlayer.rack.remove(tile)
 
                 if passedTurn:
-                    self.letterBagCodes.append(tile)
+                    self.letterBag.put(tile)
+                    self._remainingLetterCodes = None
 
             if move.fromX == GAME_OVER_BY_WIN:
                 if len(self.creator.rack) == 0:
@@ -399,50 +1117,241 @@ class Fiend(object):
 
             move.score = wordPoints
             move.words = wordsPlayed
+            move.drawCount = self._drawCount
             move.player = currentPlayer
             move.game = self
-            self.moves.append(move)
+            self._moves.append(move)
+
+            if level != VALIDATE_FULL:
+                self._levelCounts[level] = self._levelCounts.get(level, 0) + 1
+
+            # Moves added to a fork never happened, so they aren't counted.
+            if self.parent is not None and self.forkedFrom is None:
+                if self.parent.stats is not None:
+                    self.parent.stats.addMove(self, move)
+                if self.parent.wordIndex is not None:
+                    self.parent.wordIndex.addMove(self, move)
+
+        def fork(self, moveIndex=None):
+            '''
+            Returns a copy of the game that moves can be added to without
+            changing this one, for trying out other moves.
+
+            A fork of the game as it is now shares its board, letter bag and
+            random generator with this game until one of them changes, so
+            making one is cheap. A fork at an earlier move is made by replaying
+            the game up to that move.
+
+            Params:
+                moveIndex - The move to fork the game after. Defaults to the
+                            last move.
+            '''
+
+            self._replayMoves()
+
+            if moveIndex is not None and moveIndex != len(self._moves) - 1:
+                if not 0 <= moveIndex < len(self._moves):
+                    raise Fiend.GameError('There is no move at moveIndex %d' % moveIndex, self)
+
+                return self._replayFork(moveIndex)
+
+            other = Fiend.Game.__new__(Fiend.Game)
+
+            for field in GAME_ROW_FIELDS:
+                if field != 'randomSeed':
+                    setattr(other, field, getattr(self, field))
+
+            other.parent = self.parent
+            other.forkedFrom = self
+            other._validation = self._validation
+            other._levelCounts = dict(self._levelCounts)
+
+            other._board = copy.copy(self._board)
+            other._letterBag = copy.copy(self._letterBag)
+            other._randomSeed = self._randomSeed
+            other._random = copy.copy(self._random)
+            other._drawCount = self._drawCount
+            other._remainingLetterCodes = self._remainingLetterCodes[:] if self._remainingLetterCodes is not None else None
+            other._blanks = self._blanks[:]
+            other._boardChecksum = self._boardChecksum
+            other._moves = self._moves[:]
+            other._gameOver = self._gameOver
+            other._pendingMoves = []
+            other._renderCache = None
+
+            other.creator = self._forkUser(self.creator, other)
+            other.opponent = self._forkUser(self.opponent, other)
+            other.player = None if self.player is None else (other.creator if self.player is self.creator else other.opponent)
+
+            return other
+
+        def scoreMove(self, move):
+            '''
+            Returns a (points, words) pair for what a move would score if it
+            were played now, without adding it or changing the game. A move that
+            can't be played raises a MoveError, like addMove() does. Moves that
+            don't place tiles score nothing.
+            '''
+
+            self._replayMoves()
+
+            if move.fromX > 14:
+                return (0, [])
+
+            for coord in [move.fromX, move.fromY, move.toX, move.toY]:
+                if not 0 <= coord <= 14:
+                    raise Fiend.MoveError('Move is out of bounds', move, self)
+
+            # _placeTiles() fills in a move's promoted and boardChecksum if
+            # they aren't set, which they're put back from, since the move
+            # hasn't been played.
+            promoted = move.promoted
+            moveChecksum = move.boardChecksum
+
+            self.board.begin()
+
+            try:
+                numLettersPlayed, wordPoints, wordsPlayed, boardChecksum = self._placeTiles(move, self.validationLevel)
+            finally:
+                self.board.rollback()
+                move.promoted = promoted
+                move.boardChecksum = moveChecksum
+
+            return (wordPoints, wordsPlayed)
+
+        def _replayFork(self, moveIndex):
+            other = Fiend.Game()
+            other.parent = self.parent
+            other.forkedFrom = self
+            other._validation = self._validation
+
+            for field, value in zip(GAME_ROW_FIELDS, self.row):
+                setattr(other, field, value)
+
+            for user in (self.creator, self.opponent):
+                userObj = Fiend.User()
+                userObj.setWithRow(user.row)
+                other._addUser(userObj)
+
+            for move in self._moves[:moveIndex + 1]:
+                moveObj = Fiend.Move()
+                moveObj.setWithRow(move.row)
+                other.addMove(moveObj)
+
+            return other
+
+        def _forkUser(self, user, game):
+            userObj = Fiend.User()
+            userObj.setWithRow(user.row)
+            userObj._rack = user._rack[:] if user._rack is not None else None
+            userObj._score = user._score
+            userObj._game = game
+            return userObj
 
         def _assignInitialTiles(self):
             self.creator.rack = self._drawFromLetterBag(7)
             self.opponent.rack = self._drawFromLetterBag(7)
 
-        def _processUsers(self, usersXml):
+        def _processUsers(self, usersXml, knownIds=()):
+            if usersXml is None:
+                return
+
             for userXml in usersXml:
                 userObj = Fiend.User()
                 userObj.setWithXml(userXml)
 
-                if userObj.id == self.createdByUserId:
-                    userObj.rack = self.creator.rack
-                    self.creator = userObj
-                else:
-                    userObj.rack = self.opponent.rack
-                    self.opponent = userObj
+                if userObj.id not in knownIds:
+                    self._addUser(userObj)
+
+        def _addUser(self, userObj):
+            userObj._game = self
+
+            # The user takes the place of the one the game started with, which
+            # may already have a rack and a score if it's joined a game late.
+            if userObj.id == self.createdByUserId:
+                replaced = self.creator
+                self.creator = userObj
+            else:
+                replaced = self.opponent
+                self.opponent = userObj
+
+            userObj._rack = replaced._rack
+            userObj._score = replaced._score
 
+            if self.parent is not None:
                 self.player = self.creator if self.creator.id == self.parent.userId else self.opponent
 
         def _processMoves(self, movesXml):
             moveList = []
 
-            # Order the moves before adding them to a Game. They should be
-            # ordered in the XML, but this isn't required.
             for moveXml in movesXml:
                 moveObj = Fiend.Move()
                 moveObj.setWithXml(moveXml)
-                moveList.insert(moveObj.moveIndex, moveObj)
+                moveList.append(moveObj)
+
+            self._addMoves(moveList)
+
+        def _addMoves(self, moveList, lazy=False):
+            # Moves that were added by an earlier sync are left alone.
+            moveList = [moveObj for moveObj in moveList if moveObj.moveIndex >= self._numMoves]
+
+            # Order the moves before adding them to a Game. They should be
+            # ordered in the XML, but this isn't required.
+            moveList.sort(key=lambda moveObj: moveObj.moveIndex)
+
+            if self._defersMoves(lazy, moveList):
+                self._pendingMoves.extend(moveList)
+
+                # Moves whose results were loaded with them can be added to the
+                # parent's stats and wordIndex without replaying them.
+                if self.parent is not None:
+                    for collector in [self.parent.stats, self.parent.wordIndex]:
+                        if collector is not None:
+                            for moveObj in moveList:
+                                collector.addMove(self, moveObj)
+
+                return
 
             for moveObj in moveList:
                 self.addMove(moveObj)
 
+        def _defersMoves(self, lazy=False, moveList=()):
+            # The parent's stats and wordIndex are built from moves' results,
+            # so with either of those, moves are only put off if their results
+            # were loaded with them, and are replayed straight away otherwise.
+            parent = self.parent
+            if parent is None:
+                return lazy
+
+            if parent.stats is not None or parent.wordIndex is not None:
+                if [moveObj for moveObj in moveList if moveObj.score is None]:
+                    return False
+
+            return lazy or parent.lazy
+
+        @property
+        def _numMoves(self):
+            return len(self._moves) + len(self._pendingMoves)
+
+        def _replayMoves(self):
+            # Any error from a move is raised from whatever first needed the
+            # moves replayed, and the moves after it are dropped, the same as
+            # when they're added straight away.
+            if self._pendingMoves:
+                moveList = self._pendingMoves
+                self._pendingMoves = []
+
+                for moveObj in moveList:
+                    self.addMove(moveObj)
+
         def _initBoard(self):
-            return [[-1 for y in range(15)] for x in range(15)]
+            return gameboard.Board()
 
-        def _updateBoard(self, move):
+        def _updateBoard(self, move, level=VALIDATE_FULL):
             numLettersPlayed = 0
             wordPoints = 0
             wordsPlayed = []
             passedTurn = False
-            promoted = 0
 
             if move.fromX > 14:
                 # Out of bounds fromX is used to signify various game conditions:
@@ -450,228 +1359,240 @@ class Fiend(object):
                 # 99 = User resigned game due to no play
                 # 100 = User won game
                 # 101 = Piece exchange
-                numLettersPlayed = len(move.textCodes)
+                numLettersPlayed = len(move._tileCodes)
                 passedTurn = True
 
                 # Either a player won or the game ended due to someone not taking their
                 # turn in a given amount of time.
                 if GAME_OVER_BY_DECLINE <= move.fromX <= GAME_OVER_BY_WIN:
-                    self.gameOver = move.fromX
+                    self._gameOver = move.fromX
 
             else:
-                # Make a copy of the board so that if any exceptions are raised,
-                # then the actual board isn't corrupted.
-                workingBoard = copy.deepcopy(self.board)
+                for coord in [move.fromX, move.fromY, move.toX, move.toY]:
+                    if not 0 <= coord <= 14:
+                        raise Fiend.MoveError('Move is out of bounds', move, self)
 
-                if move.fromX == move.toX and move.fromY == move.toY:
-                    # Special case for one letter plays
-                    promoted = 3
+                # Log the cells this move changes so that if any exceptions are
+                # raised, the board can be rolled back instead of corrupted.
+                self.board.begin()
 
-                    try:
-                        above = workingBoard[move.fromX][move.toY+1]
-                    except IndexError:
-                        above = -1
+                try:
+                    numLettersPlayed, wordPoints, wordsPlayed, boardChecksum = self._placeTiles(move, level)
+                except BaseException:
+                    self.board.rollback()
+                    raise
 
-                    try:
-                        below = workingBoard[move.fromX][move.toY-1]
-                    except IndexError:
-                        below = -1
+                # Move was successful, keep its changes to the board
+                self.board.commit()
+                self._boardChecksum = boardChecksum
 
-                    if above != -1 or below != -1:
-                        direction = 'V'
-                    else:
-                        direction = 'H'
-                elif move.fromX == move.toX:
+                for i in [0, 1]:
+                    if move._blanks[i]:
+                        self._blanks[i] = move._blanks[i]
+
+            return (numLettersPlayed, wordPoints, wordsPlayed, passedTurn)
+
+        def _placeTiles(self, move, level=VALIDATE_FULL):
+            numLettersPlayed = 0
+            wordPoints = 0
+            discoveredPoints = 0
+            scoreMultiplier = 1
+            wordsPlayed = []
+            promoted = 0
+            board = self.board
+            cells = board.cells
+            blanks = self._blanks
+
+            if move.fromX == move.toX and move.fromY == move.toY:
+                # Special case for one letter plays
+                promoted = 3
+
+                try:
+                    above = board[move.fromX][move.toY+1]
+                except IndexError:
+                    above = -1
+
+                try:
+                    below = board[move.fromX][move.toY-1]
+                except IndexError:
+                    below = -1
+
+                if above != -1 or below != -1:
                     direction = 'V'
                 else:
                     direction = 'H'
-
+            elif move.fromX == move.toX:
+                direction = 'V'
+            else:
+                direction = 'H'
+
+            # Everything below walks the board's flat cells. Moving one space
+            # in y is a step of 1, and moving one space in x is a step of 15.
+            # Each scan is given as a starting cell, a step and a number of
+            # spaces before it reaches the edge of the board.
+            if direction == 'V':
+                if not promoted:
+                    promoted = 2
+
+                step = 1
+                crossStep = 15
+                moveLength = move.toY - move.fromY + 1
+                extendLeft = move.fromY
+                extendRight = 14 - move.toY
+            elif direction == 'H':
+                if not promoted:
+                    promoted = 1
+
+                step = 15
+                crossStep = 1
+                moveLength = move.toX - move.fromX + 1
+                extendLeft = move.fromX
+                extendRight = 14 - move.toX
+
+            if move.promoted is None:
+                move.promoted = promoted
+            elif move.promoted != promoted and level == VALIDATE_FULL:
+                raise Fiend.MoveError('Promoted value mismatch', move, self)
+
+            start = move.fromX * 15 + move.fromY
+            tileCodes = move._tileCodes
+            checkOverlap = level == VALIDATE_FULL
+            mainWord = ''
+
+            for n in range(moveLength):
+                i = start + n * step
+                code = tileCodes[n]
+
+                if code == EXISTING_TILE:
+                    code = cells[i]
+                    mainWord += blanks[code] if code == 0 or code == 1 else LETTER_MAP[code]
+                    wordPoints += CODE_VALUES[code]
+                    continue
+
+                addedLetter = move._blanks[code] if code == 0 or code == 1 else LETTER_MAP[code]
+                mainWord += addedLetter
+
+                if checkOverlap and cells[i] != -1:
+                    raise Fiend.MoveError('Move illegally overlaps an existing move', move, self)
+
+                x, y = divmod(i, 15)
+                board.set(x, y, code)
+                numLettersPlayed += 1
+
+                letterValue = CODE_VALUES[code] * LETTER_MULTIPLIERS[i]
+                wordPoints += letterValue
+
+                multOnLetter = WORD_MULTIPLIERS[i] > 1
+                scoreMultiplier *= WORD_MULTIPLIERS[i]
+
+                # Look for a word formed across the main word through this tile
                 if direction == 'V':
-                    if not promoted:
-                        promoted = 2
-
-                    moveCoords = [(move.fromX, y) for y in range(move.fromY, move.toY+1)]
-                    extendCoordsLeft = [(move.fromX, j) for j in range(move.fromY - 1, -1, -1)]
-                    extendCoordsRight = [(move.toX, j) for j in range(move.toY + 1, 15)]
-                elif direction == 'H':
-                    if not promoted:
-                        promoted = 1
-
-                    moveCoords = [(x, move.fromY) for x in range(move.fromX, move.toX+1)]
-                    extendCoordsLeft = [(j, move.fromY) for j in range(move.fromX -1, -1, -1)]
-                    extendCoordsRight = [(j, move.toY) for j in range(move.toX + 1, 15)]
-
-                if move.promoted is None:
-                    move.promoted = promoted
-                elif move.promoted != promoted:
-                    raise Fiend.MoveError('Promoted value mismatch', move, self)
-
-                discoveredPoints = 0
-                scoreMultiplier = 1
-                mainWord = ''
-
-                for i, (x,y) in enumerate(moveCoords):
-                    if move.textCodes[i] == '*':
-                        if workingBoard[x][y] == 0 or workingBoard[x][y] == 1:
-                            addedLetter = self._blanks[workingBoard[x][y]]
-                        else:
-                            addedLetter = LETTER_MAP[workingBoard[x][y]]
-                        mainWord += addedLetter
-
-                        wordPoints += LETTER_VALUES[LETTER_MAP[workingBoard[x][y]]]
+                    crossLeft, crossRight = x, 14 - x
+                else:
+                    crossLeft, crossRight = y, 14 - y
+
+                auxWord = addedLetter
+                auxPoints = 0
+                countedLetter = False
+
+                j = i
+                for dummy in range(crossLeft):
+                    j -= crossStep
+                    if cells[j] == -1:
+                        break
+
+                    auxWord = (blanks[cells[j]] if cells[j] == 0 or cells[j] == 1 else LETTER_MAP[cells[j]]) + auxWord
+                    auxPoints += CODE_VALUES[cells[j]]
+                    countedLetter = True
+
+                j = i
+                for dummy in range(crossRight):
+                    j += crossStep
+                    if cells[j] == -1:
+                        break
+
+                    auxWord += blanks[cells[j]] if cells[j] == 0 or cells[j] == 1 else LETTER_MAP[cells[j]]
+                    auxPoints += CODE_VALUES[cells[j]]
+                    countedLetter = True
+
+                if countedLetter:
+                    # The new tile counts again as part of the cross word
+                    auxPoints += letterValue
+
+                    if multOnLetter:
+                        wordPoints += auxPoints
+                    else:
+                        discoveredPoints += auxPoints
 
-                        continue
+                if len(auxWord) > 1:
+                    wordsPlayed.append(auxWord)
 
-                    else:
-                        if move.textCodes[i] == 0 or move.textCodes[i] == 1:
-                            addedLetter = move._blanks[move.textCodes[i]]
-                        else:
-                            addedLetter = LETTER_MAP[move.textCodes[i]]
-
-                        mainWord += addedLetter
-
-                    if workingBoard[x][y] != -1:
-                        raise Fiend.MoveError('Move illegally overlaps an existing move', move, self)
-
-                    workingBoard[x][y] = move.textCodes[i]
-                    numLettersPlayed += 1
-
-                    letterValue = LETTER_VALUES[LETTER_MAP[move.textCodes[i]]]
-                    if BONUS_SQUARES[x][y] == DOUBLE_LETTER:
-                        letterValue *= 2
-                    elif BONUS_SQUARES[x][y] == TRIPLE_LETTER:
-                        letterValue *= 3
-                    wordPoints += letterValue
-
-                    multOnLetter = False
-                    if BONUS_SQUARES[x][y] == DOUBLE_WORD:
-                        scoreMultiplier *= 2
-                        multOnLetter = True
-                    elif BONUS_SQUARES[x][y] == TRIPLE_WORD:
-                        scoreMultiplier *= 3
-                        multOnLetter = True
-
-                    if direction == 'V':
-                        checkCoordsLeft = [(j, y) for j in range(x-1, -1, -1)]
-                        checkCoordsRight = [(j, y) for j in range(x+1, 15)]
-                    elif direction == 'H':
-                        checkCoordsLeft = [(x, j) for j in range(y-1, -1, -1)]
-                        checkCoordsRight = [(x, j) for j in range(y+1, 15)]
-
-                    countedLetter = False
-                    onCheckCoordsLeft = True
-                    if move.textCodes[i] == 0 or move.textCodes[i] == 1:
-                        auxWord = move._blanks[move.textCodes[i]]
-                    else:
-                        auxWord = LETTER_MAP[move.textCodes[i]]
-
-                    for coords in [checkCoordsLeft, checkCoordsRight]:
-                        for (j,k) in coords:
-                            if workingBoard[j][k] == -1:
-                                if onCheckCoordsLeft:
-                                    onCheckCoordsLeft = False
-                                break
-
-                            if workingBoard[j][k] == 0 or workingBoard[j][k] == 1:
-                                addedLetter = self._blanks[workingBoard[j][k]]
-                            else:
-                                addedLetter = LETTER_MAP[workingBoard[j][k]]
-
-                            if onCheckCoordsLeft:
-                                auxWord = addedLetter + auxWord
-                            else:
-                                auxWord = auxWord + addedLetter
-
-                            if multOnLetter:
-                                wordPoints += LETTER_VALUES[LETTER_MAP[workingBoard[j][k]]]
-                            else:
-                                discoveredPoints += LETTER_VALUES[LETTER_MAP[workingBoard[j][k]]]
-
-                            if not countedLetter:
-                                if multOnLetter:
-                                    wordPoints += letterValue
-                                else:
-                                    discoveredPoints += letterValue
-
-                                countedLetter = True
-                        else:
-                            onCheckCoordsLeft = False
-
-                    if len(auxWord) > 1:
-                        wordsPlayed.append(auxWord)
-
-                onExtendCoordsLeft = True
-                for coords in [extendCoordsLeft, extendCoordsRight]:
-                    for (j,k) in coords:
-                        if workingBoard[j][k] == -1:
-                            if onExtendCoordsLeft:
-                                onExtendCoordsLeft = False
-                            break
-
-                        if workingBoard[j][k] == 0 or workingBoard[j][k] == 1:
-                            addedLetter = self._blanks[workingBoard[j][k]]
-                        else:
-                            addedLetter = LETTER_MAP[workingBoard[j][k]]
-
-                        if onExtendCoordsLeft:
-                            mainWord = addedLetter + mainWord
-                        else:
-                            mainWord = mainWord + addedLetter
-
-                        wordPoints += LETTER_VALUES[LETTER_MAP[workingBoard[j][k]]]
-                    else:
-                        onExtendCoordsLeft = False
+            # Extend the main word with any tiles it touches at either end
+            j = start
+            for dummy in range(extendLeft):
+                j -= step
+                if cells[j] == -1:
+                    break
 
-                if mainWord:
-                    # Put the main word at the front of the array
-                    wordsPlayed.insert(0, mainWord)
+                mainWord = (blanks[cells[j]] if cells[j] == 0 or cells[j] == 1 else LETTER_MAP[cells[j]]) + mainWord
+                wordPoints += CODE_VALUES[cells[j]]
 
-                wordPoints *= scoreMultiplier
-                wordPoints += discoveredPoints
+            j = move.toX * 15 + move.toY
+            for dummy in range(extendRight):
+                j += step
+                if cells[j] == -1:
+                    break
 
-                if numLettersPlayed == 7:
-                    wordPoints += 35
+                mainWord += blanks[cells[j]] if cells[j] == 0 or cells[j] == 1 else LETTER_MAP[cells[j]]
+                wordPoints += CODE_VALUES[cells[j]]
 
-                workingBoardChecksum = self._calculateBoardChecksum(workingBoard)
-                if move.boardChecksum is None:
-                    move.boardChecksum = workingBoardChecksum
-                elif move.boardChecksum != 0 and move.boardChecksum != workingBoardChecksum:
-                    raise Fiend.MoveError('Board checksum mismatch', move, self)
+            if mainWord:
+                # Put the main word at the front of the array
+                wordsPlayed.insert(0, mainWord)
 
-                # Move was successful, make working board the real board
-                self.board = workingBoard
-                self.boardChecksum = workingBoardChecksum
+            wordPoints *= scoreMultiplier
+            wordPoints += discoveredPoints
 
-                for i in [0, 1]:
-                    if move._blanks[i]:
-                        self._blanks[i] = move._blanks[i]
+            if numLettersPlayed == 7:
+                wordPoints += 35
 
-            return (numLettersPlayed, wordPoints, wordsPlayed, passedTurn)
+            boardChecksum = board.checksum
+            if move.boardChecksum is None:
+                move.boardChecksum = boardChecksum
+            elif move.boardChecksum != 0 and move.boardChecksum != boardChecksum and level != VALIDATE_TRUSTED:
+                raise Fiend.MoveError('Board checksum mismatch', move, self)
 
-        def _drawFromLetterBag(self, num, random=None, letterBagCodes=None):
-            if random is None:
-                random = self._random
+            return (numLettersPlayed, wordPoints, wordsPlayed, boardChecksum)
 
-            if letterBagCodes is None:
-                letterBagCodes = self.letterBagCodes
+        def _drawFromLetterBag(self, num, random=None, letterBag=None):
+            instruments = self.parent.instruments if self.parent is not None else None
 
-            output = []
+            if instruments is None:
+                return self._draw(num, random, letterBag)
 
-            for dummy in range(num):
-                if len(letterBagCodes) == 0:
-                    break
+            return instruments.timed('draw', self._draw, num, random, letterBag)
 
-                i = random.rand() % len(letterBagCodes)
-                output.append(letterBagCodes[i])
-                del letterBagCodes[i]
+        def _draw(self, num, random, letterBag):
+            if random is not None and letterBag is not None:
+                # A lookahead on copies, which leaves the game's state alone.
+                return letterBag.draw(num, random)
+
+            output = self.letterBag.draw(num, self._random)
+            self._drawCount += len(output)
+
+            # The draw takes the tiles off the front of the remaining sequence,
+            # and leaves the rest of it as it was.
+            if self._remainingLetterCodes is not None:
+                del self._remainingLetterCodes[:len(output)]
 
             return output
 
         def _calculateBoardChecksum(self, board=None):
             '''
-            Calculates the board_checksum value for the board in its current state.
-            Since _updateBoard() calls this, you shouldn't need to call it yourself and
-            can just rely on game.boardChecksum.
+            Calculates the board_checksum value for the board in its current state
+            by scanning every space. The board keeps its checksum up to date as tiles
+            are placed, so you shouldn't need to call this yourself and can just rely
+            on game.boardChecksum. It's still useful as a check on that value.
 
             If anyone recognizes this as a known algorithm, let me know.
             '''
@@ -684,19 +1605,20 @@ class Fiend(object):
 
             for y in range(15):
                 for x in range(15):
+                    code = board.get(x, y)
 
                     # Space doesn't have a tile on it
-                    if board[x][y] == -1:
+                    if code == -1:
                         checkSum ^= 1
 
                     # Space has the first blank on it
-                    elif board[x][y] == 0:
+                    elif code == 0:
                         checkSum ^= 2 ** ((15 * y + x) % 32)
                         numTilesPlayed += 1
 
                     # Space has the second blank or some other letter on it
                     else:
-                        checkSum ^= board[x][y]
+                        checkSum ^= code
                         numTilesPlayed += 1
 
             if numTilesPlayed % 2 == 1:
@@ -708,22 +1630,59 @@ class Fiend(object):
             return checkSum
 
     class User(object):
+        __slots__ = ('id', 'name', '_rack', '_score', '_game')
+
         def __init__(self):
             self.id = None
             self.name = None
 
-            self.rack = None
-            self.score = 0
+            self._rack = None
+            self._score = 0
+            self._game = None
+
+        @property
+        def rack(self):
+            if self._game is not None:
+                self._game._replayMoves()
+
+            return self._rack
+
+        @rack.setter
+        def rack(self, value):
+            self._rack = value
+
+        @property
+        def score(self):
+            if self._game is not None:
+                self._game._replayMoves()
+
+            return self._score
+
+        @score.setter
+        def score(self, value):
+            self._score = value
         
         def setWithXml(self, xmlElem):
             self.id = int(xmlElem.findtext('id'))
             self.name = str(xmlElem.findtext('name'))
 
+        @property
+        def row(self):
+            return tuple([getattr(self, field) for field in USER_ROW_FIELDS])
+
+        def setWithRow(self, row):
+            for field, value in zip(USER_ROW_FIELDS, row):
+                setattr(self, field, value)
+
         @property
         def rackLetters(self):
             return sorted([LETTER_MAP[num] for num in self.rack])
 
     class Move(object):
+        __slots__ = ('id', 'game', 'gameId', 'userId', 'fromX', 'fromY', 'toX', 'toY',
+                     'moveIndex', 'createdAt', 'promoted', 'boardChecksum', 'drawCount',
+                     'score', 'words', 'player', '_text', '_tileCodes', '_blanks')
+
         def __init__(self):
             self.id = None
             self.game = None
@@ -738,29 +1697,75 @@ class Fiend(object):
             self.createdAt = None
             self.promoted = None
             self.boardChecksum = None
+            self.drawCount = None
 
             self.score = None
             self.words = []
             self.player = None
 
-            self._textCodes = None
+        def setWithXml(self, xmlElem):
+            # Read all of the children in one pass rather than searching for
+            # each one. The first of any repeated tag wins, like findtext().
+            fields = {}
+            for child in xmlElem:
+                fields.setdefault(child.tag, child.text or '')
+
+            self.id = int(fields.get('id'))
+            self.gameId = int(fields.get('game-id'))
+            self.userId = int(fields.get('user-id'))
+            self.fromX = int(fields.get('from-x'))
+            self.fromY = int(fields.get('from-y'))
+            self.toX = int(fields.get('to-x'))
+            self.toY = int(fields.get('to-y'))
+            self.moveIndex = int(fields.get('move-index'))
+            self.text = str(fields.get('text'))
+            self.createdAt = str(fields.get('created-at'))
+            self.promoted = int(fields.get('promoted'))
+            self.boardChecksum = int(fields.get('board-checksum'))
 
-            self._text = None
-            self._blanks = [None, None]
+        @property
+        def row(self):
+            '''
+            The move's server data as a plain tuple, in the order of MOVE_ROW_FIELDS.
+            This is cheap to pickle and store, and setWithRow() turns it back into
+            a Move.
+            '''
 
-        def setWithXml(self, xmlElem):
-            self.id = int(xmlElem.findtext('id'))
-            self.gameId = int(xmlElem.findtext('game-id'))
-            self.userId = int(xmlElem.findtext('user-id'))
-            self.fromX = int(xmlElem.findtext('from-x'))
-            self.fromY = int(xmlElem.findtext('from-y'))
-            self.toX = int(xmlElem.findtext('to-x'))
-            self.toY = int(xmlElem.findtext('to-y'))
-            self.moveIndex = int(xmlElem.findtext('move-index'))
-            self.text = str(xmlElem.findtext('text'))
-            self.createdAt = str(xmlElem.findtext('created-at'))
-            self.promoted = int(xmlElem.findtext('promoted'))
-            self.boardChecksum = int(xmlElem.findtext('board-checksum'))
+            return tuple([getattr(self, field) for field in MOVE_ROW_FIELDS])
+
+        def setWithRow(self, row):
+            '''
+            Sets the move from a row like the one its row property gives. If
+            the row has a result row after that, like store.GameStore saves,
+            the move's results are set from it too.
+            '''
+
+            for field, value in zip(MOVE_ROW_FIELDS, row):
+                setattr(self, field, value)
+
+            if len(row) > len(MOVE_ROW_FIELDS):
+                self.setWithResultRow(row[len(MOVE_ROW_FIELDS):])
+
+        @property
+        def resultRow(self):
+            '''
+            The move's score, words and drawCount as a plain tuple, in the order
+            of MOVE_RESULT_FIELDS, with the words joined by commas. It's all None
+            until the move has been replayed.
+            '''
+
+            if self.score is None:
+                return (None,) * len(MOVE_RESULT_FIELDS)
+
+            return (self.score, ','.join(self.words), self.drawCount)
+
+        def setWithResultRow(self, row):
+            score, words, drawCount = row
+
+            if score is not None:
+                self.score = score
+                self.words = words.split(',') if words else []
+                self.drawCount = drawCount
 
         @property
         def text(self):
@@ -768,28 +1773,24 @@ class Fiend(object):
 
         @text.setter
         def text(self, value):
+            # The tile codes are read from the text once, and kept in an array
+            # with EXISTING_TILE for each '*'.
             self._text = value
+            self._tileCodes = array('b')
+            self._blanks = NO_BLANKS
 
             if self._text:
+                self._setTileCodes()
                 self._setBlanks()
 
         @property
         def textCodes(self):
-            if self._textCodes is None:
-                self._textCodes = []
-
-                if self.text != '(null)':
-                    self._textCodes = []
-                    for code in self.text[:-1].split(','):
-                        if code == '*':
-                            self.textCodes.append('*')
-                        else:
-                            try:
-                                self._textCodes.append(int(code))
-                            except ValueError:
-                                continue
-
-            return self._textCodes
+            '''
+            The tile codes played or swapped, in the order they're in the text.
+            Tiles that are already on the board are '*'.
+            '''
+
+            return ['*' if code == EXISTING_TILE else code for code in self._tileCodes]
 
         @property
         def moveXml(self):
@@ -813,10 +1814,26 @@ class Fiend(object):
 
             return moveXml
 
+        def _setTileCodes(self):
+            if self.text == '(null)':
+                return
+
+            for code in self.text[:-1].split(','):
+                if code == '*':
+                    self._tileCodes.append(EXISTING_TILE)
+                else:
+                    try:
+                        self._tileCodes.append(int(code))
+                    except ValueError:
+                        continue
+
         def _setBlanks(self):
             letterCodes = self.text[:-1].split(',')
             for i in ['0', '1']:
                 if i in letterCodes:
+                    if self._blanks is NO_BLANKS:
+                        self._blanks = [None, None]
+
                     self._blanks[int(i)] = letterCodes[letterCodes.index(i) + 1].upper()
 
     class Error(Exception):
@@ -831,6 +1848,24 @@ class Fiend(object):
         def __str__(self):
             return repr(self.msg)
 
+    class ServerError(Error):
+        '''
+        Raised when the server responds to a call with an error status.
+
+        Params:
+            msg: Error message for the exception.
+            call: The server call that failed, such as 'games'.
+            status: The HTTP status of the response.
+        '''
+
+        def __init__(self, msg, call, status):
+            self.msg = msg
+            self.call = call
+            self.status = status
+
+        def __str__(self):
+            return repr(self.msg)
+
     class MoveError(Error):
         '''
         Raised when an error occurs when adding a move to a board.
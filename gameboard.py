@@ -0,0 +1,205 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# The game board, stored as one flat array of 225 tile codes instead of a list
+# of 15 lists. Cells are indexed as x * 15 + y, so board[x][y] still works
+# through a column view for code that reads the board that way.
+#
+# Changes can be recorded in an undo log between begin() and commit(), and
+# rollback() puts back every cell that was set since begin().
+#
+# The board also keeps the parts of its board_checksum up to date as cells are
+# set, so reading checksum doesn't need to scan all 225 cells.
+
+from array import array
+
+SIZE = 15
+EMPTY = -1
+
+# What the first blank adds to the checksum on each cell, by flat index.
+BLANK_CHECKSUMS = [2 ** ((SIZE * y + x) % 32) for x in range(SIZE) for y in range(SIZE)]
+
+class Board(object):
+    def __init__(self):
+        self.cells = array('b', [EMPTY]) * (SIZE * SIZE)
+        self._undo = None
+
+        # Whether cells is shared with a copy of the board, and has to be
+        # copied before it's changed.
+        self._shared = False
+
+        # Every cell starts empty, and each empty cell XORs in a 1.
+        self._checkSum = (SIZE * SIZE) % 2
+        self._numTiles = 0
+
+    @property
+    def checksum(self):
+        '''
+        The board_checksum value for the board in its current state.
+        '''
+
+        checkSum = self._checkSum
+
+        if self._numTiles % 2 == 1:
+            checkSum = -checkSum
+
+            if (checkSum ^ 2) % 2 == 0:
+                checkSum -= 2
+
+        return checkSum
+
+    def get(self, x, y):
+        return self.cells[x * SIZE + y]
+
+    def set(self, x, y, code):
+        i = x * SIZE + y
+
+        if self._undo is not None:
+            self._undo.append((i, self.cells[i]))
+
+        self._put(i, code)
+
+    def begin(self):
+        '''
+        Starts recording changes so that they can be rolled back.
+        '''
+
+        # Copy shared cells now, so that code holding on to cells while it
+        # makes changes sees them.
+        if self._shared:
+            self._unshare()
+
+        self._undo = []
+
+    def commit(self):
+        '''
+        Keeps the changes made since begin() and stops recording.
+        '''
+
+        self._undo = None
+
+    def rollback(self):
+        '''
+        Puts back every cell changed since begin() and stops recording.
+        '''
+
+        for i, code in reversed(self._undo):
+            self._put(i, code)
+
+        self._undo = None
+
+    def __copy__(self):
+        '''
+        Returns a copy of the board that shares its cells with this one until
+        either of them is changed.
+        '''
+
+        other = Board.__new__(Board)
+        other.cells = self.cells
+        other._undo = None
+        other._checkSum = self._checkSum
+        other._numTiles = self._numTiles
+
+        other._shared = self._shared = True
+
+        return other
+
+    def __deepcopy__(self, memo):
+        return self.__copy__()
+
+    def _unshare(self):
+        self.cells = self.cells[:]
+        self._shared = False
+
+    def _put(self, i, code):
+        if self._shared:
+            self._unshare()
+
+        old = self.cells[i]
+        self.cells[i] = code
+
+        # Take the old cell out of the checksum and put the new one in.
+        self._checkSum ^= _cellChecksum(i, old) ^ _cellChecksum(i, code)
+
+        if old != EMPTY:
+            self._numTiles -= 1
+
+        if code != EMPTY:
+            self._numTiles += 1
+
+    def __len__(self):
+        return SIZE
+
+    def __getitem__(self, x):
+        if x < 0:
+            x += SIZE
+
+        if not 0 <= x < SIZE:
+            raise IndexError('board index out of range')
+
+        return Column(self, x)
+
+    def __iter__(self):
+        for x in range(SIZE):
+            yield Column(self, x)
+
+def _cellChecksum(i, code):
+    # The same rules as Game._calculateBoardChecksum() uses for each cell.
+    if code == EMPTY:
+        return 1
+    elif code == 0:
+        return BLANK_CHECKSUMS[i]
+    else:
+        return code
+
+class Column(object):
+    '''
+    A view of one column of a Board, so that board[x][y] reads and writes
+    the board like the old list of lists did.
+    '''
+
+    def __init__(self, board, x):
+        self.board = board
+        self.x = x
+
+    def __len__(self):
+        return SIZE
+
+    def __getitem__(self, y):
+        return self.board.get(self.x, self._index(y))
+
+    def __setitem__(self, y, code):
+        self.board.set(self.x, self._index(y), code)
+
+    def __iter__(self):
+        for y in range(SIZE):
+            yield self.board.get(self.x, y)
+
+    def _index(self, y):
+        if y < 0:
+            y += SIZE
+
+        if not 0 <= y < SIZE:
+            raise IndexError('board index out of range')
+
+        return y
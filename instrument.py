@@ -0,0 +1,174 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Counters and timings for Fiend's hot paths. Give a Fiend an Instruments
+# object and it records how many times each stage ran, how long it took and
+# how many bytes it moved. The stages are:
+#
+#     network - Server calls, with network.<call> for each kind of call.
+#     parse   - Reading game elements out of the XML.
+#     build   - Setting games from their XML, which includes replaying them
+#               unless the Fiend is lazy.
+#     replay  - Adding moves to games.
+#     draw    - Drawing tiles from a game's letter bag.
+#     store   - Saving synced games to a GameStore.
+#
+# Stages can run inside each other, so their times don't add up to the total.
+# Without an Instruments object, none of this costs more than a check for None.
+
+import threading
+import timeit
+from collections import deque
+
+clock = timeit.default_timer
+
+# How many recent timings of each stage the percentiles are worked out from.
+LATENCY_SAMPLES = 1024
+
+PERCENTILES = (50, 90, 99)
+
+class Instruments(object):
+    def __init__(self, exportEvery=None):
+        '''
+        Params:
+            exportEvery - If it's given, export() is called whenever this many
+                          seconds have passed since it was last called.
+        '''
+
+        self.exportEvery = exportEvery
+        self._exporters = []
+        self._lastExport = clock()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        '''
+        Clears every counter.
+        '''
+
+        with self._lock:
+            # Stage names mapped to [count, total seconds, bytes, recent timings].
+            self._counters = {}
+
+    def record(self, name, seconds, numBytes=0):
+        '''
+        Records that a stage ran once, for the given number of seconds.
+        '''
+
+        with self._lock:
+            counter = self._counters.get(name)
+            if counter is None:
+                counter = self._counters[name] = [0, 0.0, 0, deque(maxlen=LATENCY_SAMPLES)]
+
+            counter[0] += 1
+            counter[1] += seconds
+            counter[2] += numBytes
+            counter[3].append(seconds)
+
+        if self.exportEvery is not None and clock() - self._lastExport >= self.exportEvery:
+            self.export()
+
+    def timed(self, name, function, *args):
+        '''
+        Calls a function with the given args, records how long it took under
+        name, and returns what it returned. Calls that raise are recorded too.
+        '''
+
+        start = clock()
+
+        try:
+            return function(*args)
+        finally:
+            self.record(name, clock() - start)
+
+    def timedIter(self, name, iterator):
+        '''
+        Yields the items of an iterator, recording how long each one took to get.
+        '''
+
+        iterator = iter(iterator)
+
+        while True:
+            start = clock()
+
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.record(name, clock() - start)
+
+            yield item
+
+    def snapshot(self):
+        '''
+        Returns a dictionary with stage names as the keys, and dictionaries of
+        their count, total, mean, max and p50, p90 and p99 seconds, and bytes
+        as the values. The percentiles are over recent timings.
+        '''
+
+        with self._lock:
+            counters = [(name, counter[0], counter[1], counter[2], sorted(counter[3]))
+                        for name, counter in self._counters.items()]
+
+        snapshot = {}
+
+        for name, count, total, numBytes, timings in counters:
+            stats = {
+                'count': count,
+                'total': total,
+                'mean':  total / count,
+                'max':   timings[-1],
+                'bytes': numBytes
+            }
+
+            for percentile in PERCENTILES:
+                stats['p%d' % percentile] = timings[(len(timings) - 1) * percentile // 100]
+
+            snapshot[name] = stats
+
+        return snapshot
+
+    def addExporter(self, exporter):
+        '''
+        Adds a function that export() calls with a snapshot, such as one that
+        logs it or sends it to a metrics service.
+        '''
+
+        self._exporters.append(exporter)
+
+    def removeExporter(self, exporter):
+        self._exporters.remove(exporter)
+
+    def export(self):
+        '''
+        Calls every exporter with a snapshot.
+        '''
+
+        self._lastExport = clock()
+
+        if self._exporters:
+            snapshot = self.snapshot()
+
+            for exporter in list(self._exporters):
+                exporter(snapshot)
@@ -0,0 +1,178 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# The bag of tiles that haven't been drawn yet. Words with Friends draws a
+# tile by taking a random number modulo the number of tiles left and removing
+# the tile at that position, with tiles returned by a swap going on the end.
+# LetterBag keeps that ordering, but finds and removes the tile with a Fenwick
+# tree over the tile slots instead of deleting from the middle of a list.
+#
+# Fenwick tree reference: http://en.wikipedia.org/wiki/Fenwick_tree
+
+# Returned tiles are kept in a short list after the tree's slots, and folded
+# into the tree once there are more than this many of them.
+MAX_RETURNED = 16
+
+class LetterBag(object):
+    def __init__(self, codes=()):
+        self._build(list(codes))
+
+    def __len__(self):
+        return self._size + len(self._returned)
+
+    def __iter__(self):
+        for slot in range(1, len(self._slots)):
+            if self._isLive(slot):
+                yield self._slots[slot]
+
+        for code in self._returned:
+            yield code
+
+    def __repr__(self):
+        return 'LetterBag(' + repr(list(self)) + ')'
+
+    def draw(self, num, random):
+        '''
+        Draws up to num tiles, using one number from random for each. Returns
+        the drawn codes in the order they were drawn.
+        '''
+
+        # Each draw uses up exactly one random number until the bag runs out,
+        # so they can all be generated up front.
+        output = []
+
+        for r in random.randArray(min(num, len(self))):
+            output.append(self.pop(r % len(self)))
+
+        return output
+
+    def pop(self, i):
+        '''
+        Removes and returns the code at position i in the bag.
+        '''
+
+        if self._shared:
+            self._unshare()
+
+        if i >= self._size:
+            return self._returned.pop(i - self._size)
+
+        tree = self._tree
+        size = len(tree)
+        slot = 0
+        step = self._topStep
+
+        while step:
+            if slot + step < size and tree[slot + step] <= i:
+                slot += step
+                i -= tree[slot]
+            step >>= 1
+
+        slot += 1
+        code = self._slots[slot]
+
+        j = slot
+        while j < size:
+            tree[j] -= 1
+            j += j & -j
+
+        self._size -= 1
+
+        return code
+
+    def put(self, code):
+        '''
+        Returns a tile to the end of the bag.
+        '''
+
+        if self._shared:
+            self._unshare()
+
+        self._returned.append(code)
+
+        if len(self._returned) > MAX_RETURNED:
+            self._build(list(self))
+
+    def getstate(self):
+        return (self._slots, self._tree[:], self._size, self._returned[:])
+
+    def setstate(self, state):
+        slots, tree, self._size, returned = state
+        self._slots = slots
+        self._tree = tree[:]
+        self._returned = returned[:]
+        self._shared = False
+        self._setTopStep()
+
+    def __copy__(self):
+        other = LetterBag.__new__(LetterBag)
+
+        # The slots are replaced, never modified, so they can be shared. The
+        # tree and the returned tiles are shared until either bag changes.
+        other._slots = self._slots
+        other._tree = self._tree
+        other._size = self._size
+        other._returned = self._returned
+        other._topStep = self._topStep
+
+        other._shared = self._shared = True
+
+        return other
+
+    def __deepcopy__(self, memo):
+        return self.__copy__()
+
+    def _unshare(self):
+        self._tree = self._tree[:]
+        self._returned = self._returned[:]
+        self._shared = False
+
+    def _build(self, codes):
+        # Slot 0 is unused so that the tree can be indexed from 1.
+        self._slots = [None] + codes
+        self._tree = [0] + [1] * len(codes)
+        self._size = len(codes)
+        self._returned = []
+        self._shared = False
+
+        tree = self._tree
+        for i in range(1, len(tree)):
+            j = i + (i & -i)
+            if j < len(tree):
+                tree[j] += tree[i]
+
+        self._setTopStep()
+
+    def _setTopStep(self):
+        self._topStep = 1
+        while self._topStep * 2 < len(self._tree):
+            self._topStep *= 2
+
+    def _isLive(self, slot):
+        # A slot's own count is its tree node minus the nodes that it covers.
+        count = self._tree[slot]
+        child = 1
+        while child < slot & -slot:
+            count -= self._tree[slot - child]
+            child <<= 1
+        return count == 1
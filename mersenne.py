@@ -29,6 +29,13 @@
 #
 # Mersenne Twister reference: http://en.wikipedia.org/wiki/Mersenne_twister
 
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 N = 624
 M = 397
 UPPER_MASK = 0x80000000
@@ -37,38 +44,47 @@ DEFAULT_SEED = 4357
 MAG01 = [0x0, 0x9908b0df]
 
 class Mersenne(object):
-    def __init__(self, seed=DEFAULT_SEED):
+    def __init__(self, seed=DEFAULT_SEED, useNumpy=None):
+        '''
+        Params:
+            seed - The initial seed.
+            useNumpy - Whether to refresh the state with NumPy. Defaults to
+                       using it when it's installed. Both paths produce the
+                       same sequence.
+        '''
+
+        if useNumpy is None:
+            useNumpy = numpy is not None
+        elif useNumpy and numpy is None:
+            raise ImportError('NumPy is not installed')
+
+        self.useNumpy = useNumpy
         self.seed(seed)
 
     def seed(self, seed):
-        self.mt = []
+        # Every game seeds its own generator as it's loaded, so the previous
+        # word is kept in a local rather than looked up in the list.
+        y = seed & 0xffffffff
+        self.mt = [y]
 
-        self.mt.append(seed & 0xffffffff)
         for i in range(1, N+1):
-            self.mt.append(1812433253 * (self.mt[i-1] ^ (self.mt[i-1] >> 30)) + i)
-            self.mt[i] &= 0xffffffff
+            y = (1812433253 * (y ^ (y >> 30)) + i) & 0xffffffff
+            self.mt.append(y)
+
+        if self.useNumpy:
+            self.mt = numpy.array(self.mt, dtype=numpy.uint32)
 
         self.mti = i
+        self._block = None
 
     def rand(self):
-        y = 0
-
         if self.mti >= N:
-            if self.mti == N+1:
-                self.seed(DEFAULT_SEED)
+            self._refill()
 
-            for kk in range((N-M) + 1):
-                y = (self.mt[kk]&UPPER_MASK)|(self.mt[kk+1]&LOWER_MASK)
-                self.mt[kk] = self.mt[kk+M] ^ (y >> 1) ^ MAG01[y & 0x1]
-
-            for kk in range(kk, N):
-                y = (self.mt[kk]&UPPER_MASK)|(self.mt[kk+1]&LOWER_MASK)
-                self.mt[kk] = self.mt[kk+(M-N)] ^ (y >> 1) ^ MAG01[y & 0x1]
-
-            y = (self.mt[N-1]&UPPER_MASK)|(self.mt[0]&LOWER_MASK)
-            self.mt[N-1] = self.mt[M-1] ^ (y >> 1) ^ MAG01[y & 0x1]
-
-            self.mti = 0
+        if self._block is not None:
+            y = self._block[self.mti]
+            self.mti += 1
+            return y
 
         y = self.mt[self.mti]
         self.mti += 1
@@ -79,3 +95,155 @@ class Mersenne(object):
         y ^= (y >> 18)
 
         return y
+
+    def randArray(self, num):
+        '''
+        Returns a list of the next num values. This is the same sequence that
+        num calls to rand() would return, but it's read a block at a time.
+        '''
+
+        output = []
+
+        while num > 0:
+            if self.mti >= N:
+                self._refill()
+
+            end = min(self.mti + num, N)
+
+            if self._block is not None:
+                output.extend(self._block[self.mti:end])
+            else:
+                for y in self.mt[self.mti:end]:
+                    y ^= (y >> 11)
+                    y ^= (y << 7) & 0x9d2c5680
+                    y ^= (y << 15) & 0xefc60000
+                    y ^= (y >> 18)
+                    output.append(y)
+
+            num -= end - self.mti
+            self.mti = end
+
+        return output
+
+    def skip(self, num):
+        '''
+        Advances the generator by num values without producing them. Whole
+        blocks are skipped by twisting the state without tempering it.
+        '''
+
+        if num <= N - self.mti:
+            self.mti += num
+            return
+
+        if self.mti < N:
+            num -= N - self.mti
+
+        twists, offset = divmod(num - 1, N)
+
+        if self.mti == N+1:
+            self.seed(DEFAULT_SEED)
+
+        for i in range(twists):
+            if self.useNumpy:
+                self._twistNumpy(temper=False)
+            else:
+                self._twist()
+
+        self._refill()
+        self.mti = offset + 1
+
+    def getstate(self):
+        '''
+        Returns the generator's state as a tuple of an array('I') of the state
+        words and the position within them. Pass it to setstate() to restore.
+        '''
+
+        return (array('I', self.mt), self.mti)
+
+    def setstate(self, state):
+        words, self.mti = state
+
+        if self.useNumpy:
+            self.mt = numpy.array(words, dtype=numpy.uint32)
+            self._block = _temper(self.mt[:N]) if self.mti < N else None
+        else:
+            self.mt = list(words)
+            self._block = None
+
+    def __copy__(self):
+        other = Mersenne.__new__(Mersenne)
+        other.useNumpy = self.useNumpy
+        other.mti = self.mti
+
+        # The numpy twist replaces the state words rather than changing them,
+        # so they can be shared, like the block. The plain twist changes them
+        # in place.
+        other.mt = self.mt if self.useNumpy else self.mt[:]
+        other._block = self._block
+
+        return other
+
+    def __deepcopy__(self, memo):
+        return self.__copy__()
+
+    def _refill(self):
+        if self.mti == N+1:
+            self.seed(DEFAULT_SEED)
+
+        if self.useNumpy:
+            self._twistNumpy()
+        else:
+            self._twist()
+
+        self.mti = 0
+
+    def _twist(self):
+        # Note that this isn't quite the reference twist: the first loop runs
+        # one past N-M, reading the extra word that seed() leaves at mt[N], and
+        # the second loop starts over at that same kk. Words with Friends
+        # draws its tiles with exactly this sequence, so it has to stay.
+        for kk in range((N-M) + 1):
+            y = (self.mt[kk]&UPPER_MASK)|(self.mt[kk+1]&LOWER_MASK)
+            self.mt[kk] = self.mt[kk+M] ^ (y >> 1) ^ MAG01[y & 0x1]
+
+        for kk in range(kk, N):
+            y = (self.mt[kk]&UPPER_MASK)|(self.mt[kk+1]&LOWER_MASK)
+            self.mt[kk] = self.mt[kk+(M-N)] ^ (y >> 1) ^ MAG01[y & 0x1]
+
+        y = (self.mt[N-1]&UPPER_MASK)|(self.mt[0]&LOWER_MASK)
+        self.mt[N-1] = self.mt[M-1] ^ (y >> 1) ^ MAG01[y & 0x1]
+
+    def _twistNumpy(self, temper=True):
+        # The same twist as _twist(), in slices. Each word of the second loop
+        # depends on the word N-M places before it, so that loop is done in
+        # two chunks that are each only reading words that are already final.
+        old = self.mt
+        mt = old.copy()
+        lag = N - M
+
+        mt[:lag+1] = old[M:N+1] ^ _mix(old[:lag+1], old[1:lag+2])
+        mt[lag] = mt[0] ^ _mix(mt[lag:lag+1], old[lag+1:lag+2])[0]
+        mt[lag+1:2*lag] = mt[1:lag] ^ _mix(old[lag+1:2*lag], old[lag+2:2*lag+1])
+        mt[2*lag:N] = mt[lag:M] ^ _mix(old[2*lag:N], old[2*lag+1:N+1])
+        mt[N-1] = mt[M-1] ^ _mix(mt[N-1:N], mt[0:1])[0]
+
+        self.mt = mt
+        self._block = _temper(mt[:N]) if temper else None
+
+def _temper(words):
+    y = words.copy()
+    y ^= (y >> 11)
+    y ^= (y << 7) & 0x9d2c5680
+    y ^= (y << 15) & 0xefc60000
+    y ^= (y >> 18)
+
+    # A typed array holds the block in a quarter of the memory of a list of
+    # ints, which matters when every game keeps its own generator.
+    if array('I').itemsize == 4:
+        return array('I', y.tobytes())
+
+    return y.tolist()
+
+def _mix(upper, lower):
+    y = (upper & UPPER_MASK) | (lower & LOWER_MASK)
+    return (y >> 1) ^ ((y & 0x1) * MAG01[1])
@@ -0,0 +1,135 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Replays large batches of games across a pool of worker processes. Only the
+# raw game data goes to the workers and only a compact ReplayResult comes back
+# for each game, so no Game objects are pickled between processes.
+
+import collections
+import multiprocessing
+import xml.etree.ElementTree as etree
+from fiend import Fiend, MOVE_ROW_FIELDS
+
+DEFAULT_CHUNK_SIZE = 64
+
+MOVE_INDEX = MOVE_ROW_FIELDS.index('moveIndex')
+
+# board is an array('b') of the board's cells, indexed as x * 15 + y.
+# scores and racks are (creator, opponent) pairs, words and moveScores have
+# one entry per move, and error is None or a (moveIndex, message) pair for the
+# move that failed validation, such as a board checksum mismatch, or for where
+# the game's data couldn't be read. Replay stops there, so everything else
+# describes the game just before it.
+ReplayResult = collections.namedtuple('ReplayResult', [
+    'gameId', 'board', 'boardChecksum', 'scores', 'racks', 'words',
+    'moveScores', 'gameOver', 'error'])
+
+def replayGames(games, workers=None, chunkSize=DEFAULT_CHUNK_SIZE):
+    '''
+    Replays every game and yields a ReplayResult for each one, in the same
+    order as games.
+
+    Params:
+        games - An iterable of games. Each one is either the XML of a <game>
+                element, as a string, or a tuple of (gameId, randomSeed,
+                (creatorId, opponentId), moveRows) with moveRows in the form
+                of Move.row.
+        workers - The number of worker processes. Defaults to the number of
+                  CPUs. With 1, the games are replayed in this process.
+        chunkSize - The number of games sent to a worker at a time.
+    '''
+
+    chunks = _chunks(games, chunkSize)
+
+    if workers == 1:
+        for chunk in chunks:
+            for result in _replayChunk(chunk):
+                yield result
+        return
+
+    pool = multiprocessing.Pool(workers)
+
+    try:
+        for results in pool.imap(_replayChunk, chunks):
+            for result in results:
+                yield result
+    except BaseException:
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+
+def _chunks(games, chunkSize):
+    chunk = []
+
+    for game in games:
+        chunk.append(game)
+
+        if len(chunk) == chunkSize:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+def _replayChunk(chunk):
+    return [_replayGame(game) for game in chunk]
+
+def _replayGame(data):
+    game = Fiend.Game()
+    error = None
+
+    try:
+        if isinstance(data, tuple):
+            gameId, randomSeed, (creatorId, opponentId), moveRows = data
+
+            game.id = gameId
+            game.createdByUserId = creatorId
+            game.creator.id = creatorId
+            game.opponent.id = opponentId
+            game.randomSeed = randomSeed
+
+            for row in sorted(moveRows, key=lambda row: row[MOVE_INDEX]):
+                move = Fiend.Move()
+                move.setWithRow(row)
+                game.addMove(move)
+        else:
+            game.setWithXml(etree.fromstring(data))
+    except Exception as e:
+        # Anything that goes wrong with one game, such as a field that isn't
+        # a number, is kept in its result rather than ending the whole batch.
+        message = e.msg if isinstance(e, Fiend.Error) else '%s: %s' % (type(e).__name__, e)
+        error = (len(game.moves), message)
+
+    return ReplayResult(
+        gameId=game.id,
+        board=game.board.cells,
+        boardChecksum=game.boardChecksum,
+        scores=(game.creator.score, game.opponent.score),
+        racks=(game.creator.rack, game.opponent.rack),
+        words=[move.words for move in game.moves],
+        moveScores=[move.score for move in game.moves],
+        gameOver=game.gameOver,
+        error=error)
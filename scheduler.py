@@ -0,0 +1,307 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Polls many accounts through one shared transport. Each account is a Fiend
+# object, and the scheduler decides which one to sync next: an account is only
+# polled once its minimum interval has passed, every poll waits for the global
+# request rate, and accounts with games waiting on an opponent's move are
+# favoured over ones that are waiting on us, since that's where new moves come
+# from. They're favoured by a head start rather than strictly: an account that
+# is waiting on an opponent goes ahead of idle accounts that have been due for
+# less than minInterval longer than it, and otherwise the account that has
+# been due the longest goes first, so idle accounts aren't starved when the
+# rate can't keep up.
+
+import heapq
+import threading
+import time
+from transport import Transport
+
+DEFAULT_RATE = 5.0
+DEFAULT_MIN_INTERVAL = 30.0
+DEFAULT_IDLE_INTERVAL = 300.0
+
+# How many recent poll latencies the metrics are worked out from.
+LATENCY_SAMPLES = 1000
+
+try:
+    clock = time.monotonic
+except AttributeError:
+    clock = time.time
+
+class Scheduler(object):
+    def __init__(self, transport=None, rate=DEFAULT_RATE, burst=1, minInterval=DEFAULT_MIN_INTERVAL, idleInterval=DEFAULT_IDLE_INTERVAL):
+        '''
+        Params:
+            transport - The transport.Transport that every account's requests
+                        are made with. A new one is made if it's not given.
+            rate - The most polls per second, over all the accounts.
+            burst - How many polls can be made at once after a quiet spell,
+                    before the rate applies.
+            minInterval - The least number of seconds between two polls of the
+                          same account.
+            idleInterval - The number of seconds between polls of an account
+                           that has no game waiting on an opponent's move.
+        '''
+
+        self.transport = transport if transport is not None else Transport()
+        self.rate = float(rate)
+        self.burst = burst
+        self.minInterval = minInterval
+        self.idleInterval = max(idleInterval, minInterval)
+
+        # Each account has an entry of [dueTime, priority, order, account],
+        # where priority 0 is for accounts waiting on an opponent and 1 is for
+        # idle ones. Entries are kept in a heap by due time until they're due,
+        # and then moved to a heap of (rank, order, entry), where the rank is
+        # the due time less any head start. Removed accounts are left in the
+        # heaps with account set to None, and are skipped when they come up.
+        self._queue = []
+        self._ready = []
+        self._entries = {}
+        self._order = 0
+        self._synced = set()
+
+        self._tokens = float(burst)
+        self._tokenTime = clock()
+
+        self._polls = 0
+        self._errors = 0
+        self._latencies = []
+        self._rateWait = 0.0
+
+        self._lock = threading.Condition()
+        self._stopped = False
+
+    def addAccount(self, fiend, dueTime=None):
+        '''
+        Adds a Fiend object to be polled, and makes it use the scheduler's
+        transport. It's polled as soon as possible unless dueTime is given.
+        '''
+
+        with self._lock:
+            if id(fiend) in self._entries:
+                return
+
+            fiend.transport = self.transport
+            self._schedule(fiend, clock() if dueTime is None else dueTime, 1)
+            self._lock.notify_all()
+
+    def removeAccount(self, fiend):
+        '''
+        Stops polling a Fiend object. A poll that's already running is let finish.
+        '''
+
+        with self._lock:
+            entry = self._entries.pop(id(fiend), None)
+
+            if entry is not None:
+                entry[-1] = None
+
+            self._synced.discard(id(fiend))
+
+    @property
+    def accounts(self):
+        with self._lock:
+            return [entry[-1] for entry in self._entries.values()]
+
+    def pollNext(self, block=True):
+        '''
+        Syncs the account that's due most urgently, and returns its Fiend object.
+        If no account is due, this waits for one when block is True, and
+        returns None straight away otherwise. None is also returned once stop()
+        has been called.
+        '''
+
+        with self._lock:
+            entry = self._nextDue(block)
+            if entry is None:
+                return None
+
+            fiend = entry[-1]
+
+            # Other threads can take accounts while this one waits on the rate.
+            self._waitForToken()
+
+        start = clock()
+        failed = False
+
+        try:
+            # The first poll lets the games property load the store, or do a
+            # full refresh, and the ones after only ask for changes. An account
+            # whose games were already loaded only asks for changes from the
+            # start, since the games property wouldn't make a request for it.
+            if id(fiend) in self._synced or fiend._games:
+                fiend.syncGames()
+                self._synced.add(id(fiend))
+            else:
+                fiend.games
+                self._synced.add(id(fiend))
+        except Exception:
+            failed = True
+            raise
+        finally:
+            latency = clock() - start
+            waiting = bool(fiend.opponentMoveGames)
+
+            with self._lock:
+                self._polls += 1
+                self._errors += failed
+                self._latencies.append(latency)
+                del self._latencies[:-LATENCY_SAMPLES]
+
+                if self._entries.pop(id(fiend), None) is not None:
+                    self._schedule(fiend, start + (self.minInterval if waiting else self.idleInterval), 0 if waiting else 1)
+                    self._lock.notify_all()
+
+        return fiend
+
+    def run(self, threads=None):
+        '''
+        Polls accounts until stop() is called. Polls are made from as many
+        threads as the transport has connections, unless threads is given.
+        An account whose poll fails is rescheduled as usual.
+        '''
+
+        if threads is None:
+            threads = self.transport.maxConnections
+
+        with self._lock:
+            self._stopped = False
+
+        workers = [threading.Thread(target=self._work) for i in range(threads)]
+
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+
+        for worker in workers:
+            worker.join()
+
+    def stop(self):
+        '''
+        Makes run() return once the polls that are running have finished.
+        '''
+
+        with self._lock:
+            self._stopped = True
+            self._lock.notify_all()
+
+    @property
+    def metrics(self):
+        '''
+        A dictionary of:
+            accounts - The number of accounts.
+            queueDepth - The number of accounts that are due to be polled now.
+            waiting - The number of accounts with a game waiting on an opponent.
+            polls, errors - The number of polls made, and how many of them failed.
+            rateWait - The total seconds that polls have waited for the rate limit.
+            latencyMean, latencyP50, latencyP95, latencyMax - Poll times in seconds,
+                                                              over recent polls.
+        '''
+
+        with self._lock:
+            now = clock()
+            entries = list(self._entries.values())
+            latencies = sorted(self._latencies)
+
+            metrics = {
+                'accounts':   len(entries),
+                'queueDepth': len([entry for entry in entries if entry[0] <= now]),
+                'waiting':    len([entry for entry in entries if entry[1] == 0]),
+                'polls':      self._polls,
+                'errors':     self._errors,
+                'rateWait':   self._rateWait
+            }
+
+        if latencies:
+            metrics['latencyMean'] = sum(latencies) / len(latencies)
+            metrics['latencyP50'] = latencies[(len(latencies) - 1) // 2]
+            metrics['latencyP95'] = latencies[(len(latencies) - 1) * 95 // 100]
+            metrics['latencyMax'] = latencies[-1]
+        else:
+            metrics['latencyMean'] = metrics['latencyP50'] = metrics['latencyP95'] = metrics['latencyMax'] = None
+
+        return metrics
+
+    def _work(self):
+        while True:
+            try:
+                if self.pollNext() is None:
+                    return
+            except Exception:
+                pass
+
+    def _schedule(self, fiend, dueTime, priority):
+        self._order += 1
+        entry = [dueTime, priority, self._order, fiend]
+        self._entries[id(fiend)] = entry
+        heapq.heappush(self._queue, entry)
+
+    def _nextDue(self, block):
+        # Each entry is moved from the queue to the ready heap once, when it
+        # becomes due, so taking an account doesn't touch the others.
+        while not self._stopped:
+            now = clock()
+
+            while self._queue and self._queue[0][0] <= now:
+                entry = heapq.heappop(self._queue)
+                if entry[-1] is not None:
+                    rank = entry[0] - self.minInterval if entry[1] == 0 else entry[0]
+                    heapq.heappush(self._ready, (rank, entry[2], entry))
+
+            while self._ready:
+                best = heapq.heappop(self._ready)[-1]
+
+                if best[-1] is not None:
+                    # The account stays in _entries while it's polled, with a
+                    # due time that never comes, so it's counted but not taken
+                    # twice.
+                    best[0] = float('inf')
+                    return best
+
+            if not block:
+                return None
+
+            while self._queue and self._queue[0][-1] is None:
+                heapq.heappop(self._queue)
+
+            self._lock.wait(self._queue[0][0] - now if self._queue else None)
+
+        return None
+
+    def _waitForToken(self):
+        start = clock()
+
+        while True:
+            now = clock()
+            self._tokens = min(float(self.burst), self._tokens + (now - self._tokenTime) * self.rate)
+            self._tokenTime = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self._rateWait += now - start
+                return
+
+            self._lock.wait((1 - self._tokens) / self.rate)
+
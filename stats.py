@@ -0,0 +1,245 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Statistics over every move of every game, kept in columns. Each field of a
+# move is one typed array, so millions of moves take a few tens of megabytes,
+# and queries work on whole columns at a time. With numpy installed the
+# columns are read in place as numpy arrays, which makes the queries take
+# milliseconds. Without it, they fall back to plain Python loops.
+
+from array import array
+from collector import MoveCollector
+from fiend import EXISTING_TILE, LETTER_MULTIPLIERS, WORD_MULTIPLIERS, parseTimestamp
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# The columns, and the array typecode each one is kept in.
+STATS_FIELDS = (
+    ('gameId',           'l'),
+    ('moveIndex',        'h'),
+    ('userId',           'l'),
+    ('opponentId',       'l'),
+    ('score',            'l'),
+    ('tilesPlayed',      'b'),
+    ('bingo',            'b'),
+    ('wordMultiplier',   'b'),
+    ('letterBonuses',    'b'),
+    ('fromX',            'b'),
+    ('fromY',            'b'),
+    ('toX',              'b'),
+    ('toY',              'b'),
+    ('createdAt',        'l')
+)
+
+DEFAULT_PERIOD = 30 * 24 * 60 * 60
+DEFAULT_REGION_SIZE = 5
+DEFAULT_SCORE_BINS = (0, 10, 20, 30, 40, 50, 75, 100)
+
+class MoveStats(MoveCollector):
+    def __init__(self):
+        MoveCollector.__init__(self)
+
+        for field, typecode in STATS_FIELDS:
+            setattr(self, field, array(typecode))
+
+    def __len__(self):
+        return len(self.gameId)
+
+    def _collect(self, game, move):
+        userId = move.userId
+        opponentId = game.opponent.id if userId == game.creator.id else game.creator.id
+
+        tilesPlayed = 0
+        wordMultiplier = 1
+        letterBonuses = 0
+
+        if 0 <= move.fromX <= 14:
+            # The squares under the new tiles, which are the only ones whose
+            # bonuses count.
+            if move.fromX == move.toX:
+                step = 1
+                span = move.toY - move.fromY + 1
+            else:
+                step = 15
+                span = move.toX - move.fromX + 1
+
+            start = move.fromX * 15 + move.fromY
+
+            for n, code in enumerate(move._tileCodes[:span]):
+                if code != EXISTING_TILE:
+                    i = start + n * step
+                    tilesPlayed += 1
+                    wordMultiplier *= WORD_MULTIPLIERS[i]
+                    letterBonuses += LETTER_MULTIPLIERS[i] > 1
+
+        self.gameId.append(game.id)
+        self.moveIndex.append(move.moveIndex)
+        self.userId.append(userId)
+        self.opponentId.append(opponentId if opponentId is not None else 0)
+        self.score.append(move.score or 0)
+        self.tilesPlayed.append(tilesPlayed)
+        self.bingo.append(tilesPlayed == 7)
+        self.wordMultiplier.append(wordMultiplier)
+        self.letterBonuses.append(letterBonuses)
+        self.fromX.append(move.fromX)
+        self.fromY.append(move.fromY)
+        self.toX.append(move.toX)
+        self.toY.append(move.toY)
+        self.createdAt.append(parseTimestamp(move.createdAt))
+
+    def column(self, field):
+        '''
+        Returns a copy of a column, as a numpy array if numpy is installed,
+        and as a list otherwise.
+        '''
+
+        if numpy is not None:
+            return self._view(field).copy()
+
+        return list(getattr(self, field))
+
+    def averageScoreByOpponent(self, userId):
+        '''
+        Returns a dictionary with opponent IDs as the keys, and the average
+        score of the given user's plays against them as the values. Swaps,
+        passes and the ends of games aren't counted.
+        '''
+
+        if numpy is not None:
+            mask = (self._view('userId') == userId) & self._plays()
+            opponents = self._view('opponentId')[mask]
+            scores = self._view('score')[mask]
+
+            keys, inverse = _group(opponents)
+            totals = numpy.bincount(inverse, weights=scores)
+            counts = numpy.bincount(inverse)
+            used = counts > 0
+            return dict(zip(keys[used].tolist(), (totals[used] / counts[used]).tolist()))
+
+        totals = {}
+        for i in self._rows(lambda i: self.userId[i] == userId and self.fromX[i] <= 14):
+            total, count = totals.get(self.opponentId[i], (0, 0))
+            totals[self.opponentId[i]] = (total + self.score[i], count + 1)
+
+        return dict([(opponentId, total / float(count)) for opponentId, (total, count) in totals.items()])
+
+    def bingoRate(self, period=DEFAULT_PERIOD, userId=None):
+        '''
+        Returns a dictionary with the start of each period of time, in seconds
+        since the epoch, as the keys, and the fraction of plays in it that
+        were bingos as the values. Only the given user's plays are counted
+        if userId is given.
+        '''
+
+        if numpy is not None:
+            mask = self._plays()
+            if userId is not None:
+                mask &= self._view('userId') == userId
+
+            periods = self._view('createdAt')[mask] // period
+            keys, inverse = _group(periods)
+            counts = numpy.bincount(inverse)
+            bingos = numpy.bincount(inverse[self._view('bingo')[mask] != 0], minlength=len(counts))
+            used = counts > 0
+            return dict(zip((keys[used] * period).tolist(), (bingos[used] / counts[used]).tolist()))
+
+        rates = {}
+        for i in self._rows(lambda i: self.fromX[i] <= 14 and (userId is None or self.userId[i] == userId)):
+            key = self.createdAt[i] // period * period
+            bingos, count = rates.get(key, (0, 0))
+            rates[key] = (bingos + self.bingo[i], count + 1)
+
+        return dict([(key, bingos / float(count)) for key, (bingos, count) in rates.items()])
+
+    def scoreDistribution(self, regionSize=DEFAULT_REGION_SIZE, bins=DEFAULT_SCORE_BINS):
+        '''
+        Returns a dictionary with board regions as the keys, and a histogram
+        of the scores of the plays that start in each region as the values.
+        The board is split into squares of regionSize spaces, and a region is
+        an (x, y) pair counting those squares from the top left. Each histogram
+        is a list of the number of scores that are at least each of the bins,
+        and less than the next one.
+        '''
+
+        numBins = len(bins)
+
+        if numpy is not None:
+            mask = self._plays()
+            across = (14 // regionSize) + 1
+            # The coordinates are kept as bytes, so they're widened before the
+            # region numbers are worked out, or those would overflow.
+            fromX = self._view('fromX')[mask].astype(numpy.intp)
+            fromY = self._view('fromY')[mask].astype(numpy.intp)
+            regions = (fromX // regionSize) * across + fromY // regionSize
+            # Each score is looked up in a table of bins for every score from
+            # just under the first bin to the last, which is much quicker than
+            # searching the bins for each one.
+            low = bins[0] - 1
+            table = numpy.searchsorted(numpy.asarray(bins), numpy.arange(low, bins[-1] + 1), side='right') - 1
+            scoreBins = table[numpy.clip(self._view('score')[mask], low, bins[-1]) - low]
+
+            # Scores below the first bin aren't counted.
+            counted = scoreBins >= 0
+            counts = numpy.bincount(regions[counted] * numBins + scoreBins[counted],
+                                    minlength=across * across * numBins).reshape(across * across, numBins)
+
+            return dict([(divmod(region, across), counts[region].tolist())
+                         for region in numpy.nonzero(counts.sum(axis=1))[0].tolist()])
+
+        distribution = {}
+        for i in self._rows(lambda i: self.fromX[i] <= 14):
+            scoreBin = numBins - 1
+            while scoreBin >= 0 and self.score[i] < bins[scoreBin]:
+                scoreBin -= 1
+
+            if scoreBin >= 0:
+                region = (self.fromX[i] // regionSize, self.fromY[i] // regionSize)
+                distribution.setdefault(region, [0] * numBins)[scoreBin] += 1
+
+        return distribution
+
+    def _view(self, field):
+        # The view shares the column's memory, so it mustn't be kept past a
+        # query, or the column can't grow.
+        column = getattr(self, field)
+        return numpy.frombuffer(column, dtype=column.typecode) if column else numpy.zeros(0, dtype=column.typecode)
+
+    def _plays(self):
+        return self._view('fromX') <= 14
+
+    def _rows(self, condition):
+        return [i for i in range(len(self)) if condition(i)]
+
+def _group(keys):
+    # Returns the distinct keys and each key's index among them, like
+    # numpy.unique(). Keys that fall in a narrow range are counted straight
+    # into a bincount, with some of the returned keys unused, rather than
+    # being sorted.
+    if len(keys) and keys.max() - keys.min() <= 4 * len(keys) + 1024:
+        low = keys.min()
+        return numpy.arange(low, keys.max() + 1), keys - low
+
+    return numpy.unique(keys, return_inverse=True)
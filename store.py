@@ -0,0 +1,185 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# A local SQLite store for games, so that a new Fiend can start from what it
+# saw last time and only ask the server for what's changed since.
+#
+# It keeps the server's data for each game, user and move, in the same form
+# as their row properties, along with the results of replaying each move (its
+# score, words and drawCount) and the sync watermarks. Loading a game only
+# reads its rows, and its moves are replayed from them when they're first
+# needed. Their results are read back with them, so the moves' scores and
+# words don't need a replay.
+
+import sqlite3
+from fiend import Fiend, GAME_ROW_FIELDS, USER_ROW_FIELDS, MOVE_ROW_FIELDS, MOVE_RESULT_FIELDS
+
+# Where the game ID is in a move's row.
+MOVE_GAME_ID = MOVE_ROW_FIELDS.index('gameId')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS games (
+    %(gameFields)s,
+    PRIMARY KEY (id)
+);
+CREATE TABLE IF NOT EXISTS users (
+    gameId INTEGER NOT NULL,
+    %(userFields)s,
+    PRIMARY KEY (gameId, id)
+);
+CREATE TABLE IF NOT EXISTS moves (
+    %(moveFields)s,
+    %(resultFields)s,
+    PRIMARY KEY (gameId, moveIndex)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT NOT NULL PRIMARY KEY,
+    value
+);
+''' % {
+    'gameFields': ',\n    '.join(GAME_ROW_FIELDS),
+    'userFields': ',\n    '.join(USER_ROW_FIELDS),
+    'moveFields': ',\n    '.join(MOVE_ROW_FIELDS),
+    'resultFields': ',\n    '.join(MOVE_RESULT_FIELDS),
+}
+
+class GameStore(object):
+    def __init__(self, path):
+        '''
+        Params:
+            path - The SQLite database file. It's created if it doesn't exist.
+        '''
+
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.executescript(SCHEMA)
+
+        # Stores from before the moves' results were kept don't have their
+        # columns, and the results are filled in as the moves are replayed.
+        columns = [column[1] for column in self._db.execute('PRAGMA table_info(moves)')]
+        for field in MOVE_RESULT_FIELDS:
+            if field not in columns:
+                self._db.execute('ALTER TABLE moves ADD COLUMN %s' % field)
+
+    def saveGame(self, game):
+        '''
+        Saves a game's data and any of its moves that haven't been saved yet.
+        The moves are saved without replaying them, along with the results of
+        the ones that have been replayed. Moves that were saved before they
+        were replayed get their results once they have them.
+        '''
+
+        self._db.execute(_insert('games', GAME_ROW_FIELDS), game.row)
+
+        for user in [game.creator, game.opponent]:
+            if user.id is not None:
+                self._db.execute(_insert('users', ('gameId',) + USER_ROW_FIELDS), (game.id,) + user.row)
+
+        # Moves are replayed in order, so the saved moves with results come
+        # before the ones without.
+        numSaved, numWithResults = self._db.execute('SELECT COUNT(*), COUNT(score) FROM moves WHERE gameId = ?', (game.id,)).fetchone()
+        resultRows = game.moveResultRows
+
+        self._db.executemany(_update('moves', MOVE_RESULT_FIELDS, ('gameId', 'moveIndex')), [
+            resultRows[moveIndex] + (game.id, moveIndex)
+            for moveIndex in range(numWithResults, numSaved) if resultRows[moveIndex][0] is not None])
+
+        self._db.executemany(_insert('moves', MOVE_ROW_FIELDS + MOVE_RESULT_FIELDS), [
+            moveRow + resultRow for moveRow, resultRow in zip(game.moveRows, resultRows)][numSaved:])
+
+    def loadGames(self, parent=None):
+        '''
+        Returns a dictionary of every saved game, with game IDs as the keys and
+        Game objects as the values. Only the games and their users are read
+        straight away. Each game's moves are replayed from its saved rows when
+        something first depends on them, such as its board or a player's score.
+        The moves' saved results are set on them, so randomAt() doesn't need a
+        replay.
+
+        If the parent has stats or a wordIndex, they're filled from the saved
+        results. A game is only replayed straight away for them if some of its
+        moves were saved without results.
+        '''
+
+        # Every user and move is read in one query each, rather than one for
+        # each game.
+        userRows = {}
+        for userRow in self._db.execute(_select('users', ('gameId',) + USER_ROW_FIELDS)):
+            userRows.setdefault(userRow[0], []).append(userRow[1:])
+
+        moveRows = {}
+        for moveRow in self._db.execute(_select('moves', MOVE_ROW_FIELDS + MOVE_RESULT_FIELDS) + ' ORDER BY gameId, moveIndex'):
+            moveRows.setdefault(moveRow[MOVE_GAME_ID], []).append(moveRow)
+
+        games = {}
+
+        for row in self._db.execute(_select('games', GAME_ROW_FIELDS) + ' ORDER BY id'):
+            games[row[0]] = _makeGame(row, userRows.get(row[0], []), moveRows.get(row[0], []), parent)
+
+        return games
+
+    def loadGame(self, gameId, parent=None, row=None):
+        '''
+        Returns the saved game with the given ID, or None if it isn't saved.
+        '''
+
+        if row is None:
+            row = self._db.execute(_select('games', GAME_ROW_FIELDS) + ' WHERE id = ?', (gameId,)).fetchone()
+
+            if row is None:
+                return None
+
+        userRows = self._db.execute(_select('users', USER_ROW_FIELDS) + ' WHERE gameId = ?', (gameId,)).fetchall()
+        moveRows = self._db.execute(_select('moves', MOVE_ROW_FIELDS + MOVE_RESULT_FIELDS) + ' WHERE gameId = ? ORDER BY moveIndex', (gameId,)).fetchall()
+
+        return _makeGame(row, userRows, moveRows, parent)
+
+    def getMeta(self, key, default=None):
+        row = self._db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def setMeta(self, key, value):
+        self._db.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def commit(self):
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+def _makeGame(row, userRows, moveRows, parent):
+    game = Fiend.Game()
+    game.parent = parent
+    game.setWithRows(row, userRows, moveRows, lazy=True)
+
+    return game
+
+def _insert(table, fields):
+    return 'INSERT OR REPLACE INTO %s (%s) VALUES (%s)' % (table, ', '.join(fields), ', '.join(['?'] * len(fields)))
+
+def _update(table, fields, keyFields):
+    return 'UPDATE %s SET %s WHERE %s' % (table, ', '.join(['%s = ?' % field for field in fields]),
+                                          ' AND '.join(['%s = ?' % field for field in keyFields]))
+
+def _select(table, fields):
+    return 'SELECT %s FROM %s' % (', '.join(fields), table)
@@ -0,0 +1,262 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Generates games list XML like the server's, for benchmarks and for trying
+# Fiend out offline. The tiles are drawn with mersenne.Mersenne and a
+# letterbag.LetterBag from each game's random seed, the same way Fiend draws
+# them, and the moves are placements that Fiend's replay accepts, with board
+# checksums worked out by a gameboard.Board. The words aren't real words.
+#
+# Everything is chosen with Mersenne generators from the seed that's given,
+# so the same seed gives the same XML on every version of Python.
+
+from fiend import LETTER_MAP, GAME_OVER_BY_WIN
+from gameboard import Board, EMPTY
+from letterbag import LetterBag
+from mersenne import Mersenne
+
+DEFAULT_MAX_MOVES = 60
+
+# The fromX of a move that swaps tiles.
+SWAP = 101
+
+# The chance, out of 100, that a player swaps rather than plays, and that a
+# game that hasn't run out of tiles has ended anyway.
+SWAP_CHANCE = 5
+GAME_OVER_CHANCE = 30
+
+# How many placements are tried before a player gives up and swaps.
+PLACEMENT_TRIES = 50
+
+BLANK_LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+class Chooser(object):
+    '''
+    Makes random choices with a Mersenne generator.
+    '''
+
+    def __init__(self, seed):
+        self.random = Mersenne(seed)
+
+    def randint(self, low, high):
+        return low + self.random.rand() % (high - low + 1)
+
+    def chance(self, percent):
+        return self.random.rand() % 100 < percent
+
+    def choice(self, items):
+        return items[self.random.rand() % len(items)]
+
+    def sample(self, items, num):
+        items = list(items)
+
+        for i in range(num):
+            j = i + self.random.rand() % (len(items) - i)
+            items[i], items[j] = items[j], items[i]
+
+        return items[:num]
+
+def gamesXml(numGames, seed=1, maxMoves=DEFAULT_MAX_MOVES):
+    '''
+    Returns the XML of a games list with numGames games in it.
+
+    Params:
+        numGames - The number of games.
+        seed - The seed that the games' seeds and moves are chosen from.
+        maxMoves - The most moves a game can have, not counting the move that
+                   ends it.
+    '''
+
+    chooser = Chooser(seed)
+    games = [gameXml(gameId, chooser.random.rand(), maxMoves, Chooser(chooser.random.rand()))
+             for gameId in range(1, numGames + 1)]
+
+    return '<games>' + ''.join(games) + '</games>'
+
+def gameXml(gameId, randomSeed, maxMoves=DEFAULT_MAX_MOVES, chooser=None):
+    '''
+    Returns the XML of one game. The first of its users is the current user.
+    '''
+
+    userIds, moves = generateMoves(gameId, randomSeed, maxMoves, chooser)
+
+    xml = ['<game>', '<id>%d</id>' % gameId]
+    xml.append('<current-move-user-id>%d</current-move-user-id>' % userIds[len(moves) % 2])
+    xml.append('<created-by-user-id>%d</created-by-user-id>' % userIds[0])
+    xml.append('<chat_session_id>%d</chat_session_id>' % gameId)
+    xml.append('<is-matchmaking>false</is-matchmaking><was-matchmaking>false</was-matchmaking>')
+    xml.append('<moves-count>%d</moves-count><move_count>%d</move_count>' % (len(moves), len(moves)))
+    xml.append('<random-seed>%d</random-seed>' % randomSeed)
+    xml.append('<client-version>3.51</client-version><observers></observers>')
+    xml.append('<created-at>%s</created-at>' % _timestamp(gameId, 0))
+    xml.append('<current-user><id>%d</id><name>user%d</name><email>user%d@example.com</email></current-user>'
+               % (userIds[0], userIds[0], userIds[0]))
+
+    xml.append('<users>')
+    for userId in userIds:
+        xml.append('<user><id>%d</id><name>user%d</name></user>' % (userId, userId))
+    xml.append('</users>')
+
+    xml.append('<moves>')
+    for moveIndex, (userId, fromX, fromY, toX, toY, text, promoted, boardChecksum) in enumerate(moves):
+        xml.append('<move><id>%d</id><game-id>%d</game-id><user-id>%d</user-id>'
+                   '<from-x>%d</from-x><from-y>%d</from-y><to-x>%d</to-x><to-y>%d</to-y>'
+                   '<move-index>%d</move-index><text>%s</text><created-at>%s</created-at>'
+                   '<promoted>%d</promoted><board-checksum>%d</board-checksum></move>'
+                   % (gameId * 1000 + moveIndex, gameId, userId, fromX, fromY, toX, toY,
+                      moveIndex, text, _timestamp(gameId, moveIndex + 1), promoted, boardChecksum))
+    xml.append('</moves>')
+
+    xml.append('</game>')
+    return ''.join(xml)
+
+def generateMoves(gameId, randomSeed, maxMoves=DEFAULT_MAX_MOVES, chooser=None):
+    '''
+    Plays out a game, and returns its two user IDs and a list of its moves as
+    (userId, fromX, fromY, toX, toY, text, promoted, boardChecksum) tuples.
+    '''
+
+    if chooser is None:
+        chooser = Chooser(randomSeed)
+
+    random = Mersenne(randomSeed)
+    letterBag = LetterBag(range(len(LETTER_MAP)))
+    racks = [letterBag.draw(7, random), letterBag.draw(7, random)]
+    userIds = [gameId * 2, gameId * 2 + 1]
+    board = Board()
+    moves = []
+    player = 0
+
+    for moveIndex in range(maxMoves):
+        rack = racks[player]
+        placement = None
+
+        if rack and not chooser.chance(SWAP_CHANCE):
+            placement = _findPlacement(board, rack, chooser)
+
+        if placement is not None:
+            cells, codes, tiles, promoted = placement
+
+            textCodes = []
+            for (x, y), code in zip(cells, codes):
+                if code == '*':
+                    textCodes.append('*')
+                else:
+                    board.set(x, y, code)
+                    textCodes.append(str(code))
+
+                    if code == 0 or code == 1:
+                        textCodes.append(chooser.choice(BLANK_LETTERS))
+
+            for tile in tiles:
+                rack.remove(tile)
+            rack.extend(letterBag.draw(len(tiles), random))
+
+            (fromX, fromY), (toX, toY) = cells[0], cells[-1]
+            moves.append((userIds[player], fromX, fromY, toX, toY, ','.join(textCodes) + ',', promoted, board.checksum))
+        else:
+            # Blanks are never swapped, and there may be nothing to swap.
+            swappable = [tile for tile in rack if tile > 1]
+            tiles = chooser.sample(swappable, min(len(swappable), len(letterBag), chooser.randint(0, 3)))
+
+            rack.extend(letterBag.draw(len(tiles), random))
+            for tile in tiles:
+                rack.remove(tile)
+                letterBag.put(tile)
+
+            text = ''.join([str(tile) + ',' for tile in tiles]) or '(null)'
+            moves.append((userIds[player], SWAP, 0, 0, 0, text, 0, 0))
+
+        player = 1 - player
+
+        if not racks[0] or not racks[1]:
+            break
+
+    if not racks[0] or not racks[1] or chooser.chance(GAME_OVER_CHANCE):
+        moves.append((userIds[player], GAME_OVER_BY_WIN, 0, 0, 0, '(null)', 0, 0))
+
+    return userIds, moves
+
+def _findPlacement(board, rack, chooser):
+    # Returns the cells, codes, new tiles and promoted value of a placement of
+    # some of the rack's tiles, or None if one isn't found. Tiles that are
+    # already on the board in the way of the placement are played through.
+    empty = all([code == EMPTY for code in board.cells])
+
+    if not empty:
+        occupied = [divmod(i, 15) for i, code in enumerate(board.cells) if code != EMPTY]
+
+    for attempt in range(PLACEMENT_TRIES):
+        vertical = chooser.chance(50)
+        numTiles = chooser.randint(1, min(7, len(rack)))
+
+        if empty:
+            x, y = 7 - chooser.randint(0, numTiles - 1), 7
+            if vertical:
+                x, y = y, x
+        else:
+            x, y = chooser.choice(occupied)
+            if vertical:
+                x, y = x + chooser.choice((-1, 0, 0, 1)), y - chooser.randint(0, numTiles)
+            else:
+                x, y = x - chooser.randint(0, numTiles), y + chooser.choice((-1, 0, 0, 1))
+
+        cells = []
+        codes = []
+        numNew = 0
+
+        while numNew < numTiles and 0 <= x <= 14 and 0 <= y <= 14:
+            if board.get(x, y) != EMPTY:
+                codes.append('*')
+            else:
+                codes.append(None)
+                numNew += 1
+
+            cells.append((x, y))
+
+            if vertical:
+                y += 1
+            else:
+                x += 1
+
+        if numNew < numTiles:
+            continue
+
+        tiles = chooser.sample(rack, numTiles)
+        newTiles = iter(tiles)
+        codes = [code if code == '*' else next(newTiles) for code in codes]
+
+        if len(cells) == 1:
+            promoted = 3
+        else:
+            promoted = 2 if vertical else 1
+
+        return cells, codes, tiles, promoted
+
+    return None
+
+def _timestamp(gameId, moveIndex):
+    # One game a day, and one move a minute.
+    day = gameId % 28 + 1
+    hour, minute = divmod(moveIndex, 60)
+    return '2011-02-%02dT%02d:%02d:00Z' % (day, hour % 24, minute)
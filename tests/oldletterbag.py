@@ -0,0 +1,48 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# A frozen copy of the letter bag from before it was a Fenwick tree: the bag
+# is a plain list, a draw deletes the tile at a random position, and returned
+# tiles are appended. The tests compare LetterBag against it, so it shouldn't
+# be changed to keep up with letterbag.py.
+
+def drawFromLetterBag(letterBagCodes, num, random):
+    '''
+    Draws up to num tiles from the list, using one random.rand() for each, and
+    returns them in the order they were drawn.
+    '''
+
+    output = []
+
+    for i in range(num):
+        if len(letterBagCodes) == 0:
+            break
+
+        i = random.rand() % len(letterBagCodes)
+        output.append(letterBagCodes[i])
+        del letterBagCodes[i]
+
+    return output
+
+def putInLetterBag(letterBagCodes, code):
+    letterBagCodes.append(code)
@@ -0,0 +1,286 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# A frozen copy of the scoring kernel from before the board became a flat
+# array scored with lookup tables: the board is a list of 15 columns, each
+# move is scored on a deep copy of it, and the checksum is worked out by
+# scanning every space. The tests compare Game's scoring against it, so it
+# shouldn't be changed to keep up with fiend.py.
+
+import copy
+from fiend import (LETTER_MAP, LETTER_VALUES, BONUS_SQUARES, DOUBLE_LETTER, TRIPLE_LETTER,
+                   DOUBLE_WORD, TRIPLE_WORD)
+
+class OldMoveError(Exception):
+    pass
+
+def emptyBoard():
+    return [[-1 for y in range(15)] for x in range(15)]
+
+def parseText(text):
+    '''
+    Returns the text codes and blanks of a move's text, with '*' for tiles
+    that are already on the board.
+    '''
+
+    textCodes = []
+    blanks = [None, None]
+
+    if text and text != '(null)':
+        for code in text[:-1].split(','):
+            if code == '*':
+                textCodes.append('*')
+            else:
+                try:
+                    textCodes.append(int(code))
+                except ValueError:
+                    continue
+
+    if text:
+        letterCodes = text[:-1].split(',')
+        for i in ['0', '1']:
+            if i in letterCodes:
+                blanks[int(i)] = letterCodes[letterCodes.index(i) + 1].upper()
+
+    return textCodes, blanks
+
+def updateBoard(board, gameBlanks, fromX, fromY, toX, toY, text, movePromoted=None, moveBoardChecksum=None):
+    '''
+    Plays a move that places tiles on board. Returns the new board and blanks,
+    and the move's (numLettersPlayed, wordPoints, wordsPlayed, promoted,
+    boardChecksum). The board and blanks that are passed in aren't changed.
+    Raises OldMoveError if the move can't be played.
+    '''
+
+    textCodes, moveBlanks = parseText(text)
+    numLettersPlayed = 0
+    wordPoints = 0
+    wordsPlayed = []
+    promoted = 0
+
+    workingBoard = copy.deepcopy(board)
+
+    if fromX == toX and fromY == toY:
+        promoted = 3
+
+        try:
+            above = workingBoard[fromX][toY+1]
+        except IndexError:
+            above = -1
+
+        try:
+            below = workingBoard[fromX][toY-1]
+        except IndexError:
+            below = -1
+
+        if above != -1 or below != -1:
+            direction = 'V'
+        else:
+            direction = 'H'
+    elif fromX == toX:
+        direction = 'V'
+    else:
+        direction = 'H'
+
+    if direction == 'V':
+        if not promoted:
+            promoted = 2
+
+        moveCoords = [(fromX, y) for y in range(fromY, toY+1)]
+        extendCoordsLeft = [(fromX, j) for j in range(fromY - 1, -1, -1)]
+        extendCoordsRight = [(toX, j) for j in range(toY + 1, 15)]
+    elif direction == 'H':
+        if not promoted:
+            promoted = 1
+
+        moveCoords = [(x, fromY) for x in range(fromX, toX+1)]
+        extendCoordsLeft = [(j, fromY) for j in range(fromX -1, -1, -1)]
+        extendCoordsRight = [(j, toY) for j in range(toX + 1, 15)]
+
+    if movePromoted is not None and movePromoted != promoted:
+        raise OldMoveError('Promoted value mismatch')
+
+    discoveredPoints = 0
+    scoreMultiplier = 1
+    mainWord = ''
+
+    for i, (x,y) in enumerate(moveCoords):
+        if textCodes[i] == '*':
+            if workingBoard[x][y] == 0 or workingBoard[x][y] == 1:
+                addedLetter = gameBlanks[workingBoard[x][y]]
+            else:
+                addedLetter = LETTER_MAP[workingBoard[x][y]]
+            mainWord += addedLetter
+
+            wordPoints += LETTER_VALUES[LETTER_MAP[workingBoard[x][y]]]
+
+            continue
+
+        else:
+            if textCodes[i] == 0 or textCodes[i] == 1:
+                addedLetter = moveBlanks[textCodes[i]]
+            else:
+                addedLetter = LETTER_MAP[textCodes[i]]
+
+            mainWord += addedLetter
+
+        if workingBoard[x][y] != -1:
+            raise OldMoveError('Move illegally overlaps an existing move')
+
+        workingBoard[x][y] = textCodes[i]
+        numLettersPlayed += 1
+
+        letterValue = LETTER_VALUES[LETTER_MAP[textCodes[i]]]
+        if BONUS_SQUARES[x][y] == DOUBLE_LETTER:
+            letterValue *= 2
+        elif BONUS_SQUARES[x][y] == TRIPLE_LETTER:
+            letterValue *= 3
+        wordPoints += letterValue
+
+        multOnLetter = False
+        if BONUS_SQUARES[x][y] == DOUBLE_WORD:
+            scoreMultiplier *= 2
+            multOnLetter = True
+        elif BONUS_SQUARES[x][y] == TRIPLE_WORD:
+            scoreMultiplier *= 3
+            multOnLetter = True
+
+        if direction == 'V':
+            checkCoordsLeft = [(j, y) for j in range(x-1, -1, -1)]
+            checkCoordsRight = [(j, y) for j in range(x+1, 15)]
+        elif direction == 'H':
+            checkCoordsLeft = [(x, j) for j in range(y-1, -1, -1)]
+            checkCoordsRight = [(x, j) for j in range(y+1, 15)]
+
+        countedLetter = False
+        onCheckCoordsLeft = True
+        if textCodes[i] == 0 or textCodes[i] == 1:
+            auxWord = moveBlanks[textCodes[i]]
+        else:
+            auxWord = LETTER_MAP[textCodes[i]]
+
+        for coords in [checkCoordsLeft, checkCoordsRight]:
+            for (j,k) in coords:
+                if workingBoard[j][k] == -1:
+                    if onCheckCoordsLeft:
+                        onCheckCoordsLeft = False
+                    break
+
+                if workingBoard[j][k] == 0 or workingBoard[j][k] == 1:
+                    addedLetter = gameBlanks[workingBoard[j][k]]
+                else:
+                    addedLetter = LETTER_MAP[workingBoard[j][k]]
+
+                if onCheckCoordsLeft:
+                    auxWord = addedLetter + auxWord
+                else:
+                    auxWord = auxWord + addedLetter
+
+                if multOnLetter:
+                    wordPoints += LETTER_VALUES[LETTER_MAP[workingBoard[j][k]]]
+                else:
+                    discoveredPoints += LETTER_VALUES[LETTER_MAP[workingBoard[j][k]]]
+
+                if not countedLetter:
+                    if multOnLetter:
+                        wordPoints += letterValue
+                    else:
+                        discoveredPoints += letterValue
+
+                    countedLetter = True
+            else:
+                onCheckCoordsLeft = False
+
+        if len(auxWord) > 1:
+            wordsPlayed.append(auxWord)
+
+    onExtendCoordsLeft = True
+    for coords in [extendCoordsLeft, extendCoordsRight]:
+        for (j,k) in coords:
+            if workingBoard[j][k] == -1:
+                if onExtendCoordsLeft:
+                    onExtendCoordsLeft = False
+                break
+
+            if workingBoard[j][k] == 0 or workingBoard[j][k] == 1:
+                addedLetter = gameBlanks[workingBoard[j][k]]
+            else:
+                addedLetter = LETTER_MAP[workingBoard[j][k]]
+
+            if onExtendCoordsLeft:
+                mainWord = addedLetter + mainWord
+            else:
+                mainWord = mainWord + addedLetter
+
+            wordPoints += LETTER_VALUES[LETTER_MAP[workingBoard[j][k]]]
+        else:
+            onExtendCoordsLeft = False
+
+    if mainWord:
+        wordsPlayed.insert(0, mainWord)
+
+    wordPoints *= scoreMultiplier
+    wordPoints += discoveredPoints
+
+    if numLettersPlayed == 7:
+        wordPoints += 35
+
+    workingBoardChecksum = calculateBoardChecksum(workingBoard)
+    if moveBoardChecksum is not None and moveBoardChecksum != 0 and moveBoardChecksum != workingBoardChecksum:
+        raise OldMoveError('Board checksum mismatch')
+
+    blanks = list(gameBlanks)
+    for i in [0, 1]:
+        if moveBlanks[i]:
+            blanks[i] = moveBlanks[i]
+
+    return workingBoard, blanks, (numLettersPlayed, wordPoints, wordsPlayed, promoted, workingBoardChecksum)
+
+def calculateBoardChecksum(board):
+    checkSum = 0
+    numTilesPlayed = 0
+
+    for y in range(15):
+        for x in range(15):
+
+            # Space doesn't have a tile on it
+            if board[x][y] == -1:
+                checkSum ^= 1
+
+            # Space has the first blank on it
+            elif board[x][y] == 0:
+                checkSum ^= 2 ** ((15 * y + x) % 32)
+                numTilesPlayed += 1
+
+            # Space has the second blank or some other letter on it
+            else:
+                checkSum ^= board[x][y]
+                numTilesPlayed += 1
+
+    if numTilesPlayed % 2 == 1:
+        checkSum = -checkSum
+
+        if (checkSum ^ 2) % 2 == 0:
+            checkSum -= 2
+
+    return checkSum
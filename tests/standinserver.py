@@ -0,0 +1,126 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# A local stand-in for the server, for tests of the transports.
+
+import sys
+import threading
+import time
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, urlsplit
+
+GAMES = b'<games></games>'
+ETAG = '"games-1"'
+
+class StandInServer(ThreadingMixIn, HTTPServer):
+    '''
+    Serves GAMES with an ETag for every GET request, and a 304 with no body
+    to a request that sends that ETag back, on kept alive connections. A
+    request for /echo/<text> is answered with the text instead, after the
+    number of seconds in its delay parameter. /interim/<text> is the same,
+    but with a 100 Continue and a 103 Early Hints before the answer.
+    '''
+
+    daemon_threads = True
+
+    def __init__(self):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), StandInHandler)
+        self.url = 'http://127.0.0.1:%d/' % self.server_address[1]
+        self.statuses = []
+        self.connections = 0
+
+        # The number of requests being answered at once, and the most there
+        # have been.
+        self.active = 0
+        self.maxActive = 0
+        self.lock = threading.Lock()
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def handle_error(self, request, clientAddress):
+        # A client that timed out has closed its connection by the time it's
+        # answered, which isn't worth a traceback.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            HTTPServer.handle_error(self, request, clientAddress)
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.active += 1
+            self.server.maxActive = max(self.server.maxActive, self.server.active)
+
+        try:
+            parts = urlsplit(self.path)
+
+            if parts.path.startswith('/echo/'):
+                time.sleep(float(parse_qs(parts.query).get('delay', ['0'])[0]))
+                self.respond(200, parts.path[len('/echo/'):].encode('utf-8'))
+            elif parts.path.startswith('/interim/'):
+                self.send_response_only(100)
+                self.end_headers()
+                self.send_response_only(103)
+                self.send_header('Link', '</games>; rel=preload')
+                self.end_headers()
+                self.respond(200, parts.path[len('/interim/'):].encode('utf-8'))
+            elif self.headers.get('If-None-Match') == ETAG:
+                self.respond(304)
+            else:
+                self.respond(200, GAMES, {'Content-Type': 'text/xml'})
+        finally:
+            with self.server.lock:
+                self.server.active -= 1
+
+    def respond(self, status, body=None, headers=None):
+        self.server.statuses.append(status)
+        self.send_response(status)
+        self.send_header('ETag', ETAG)
+
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+
+        if body is not None:
+            self.send_header('Content-Length', str(len(body)))
+
+        self.end_headers()
+
+        if body is not None:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,91 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Tests for AsyncFiend and AsyncTransport against a local stand-in server.
+
+import asyncio
+import time
+import unittest
+
+from asyncfiend import AsyncFiend, AsyncTransport
+from tests.standinserver import StandInServer
+
+class AsyncFiendTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer()
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def testNotModifiedHasNoBody(self):
+        transport = AsyncTransport(timeout=3)
+        fiendObj = AsyncFiend('test@example.com', 'test', transport=transport, url=self.server.url)
+
+        async def sync():
+            try:
+                await fiendObj.refreshGames()
+                await fiendObj.syncGames()
+
+                start = time.time()
+                await fiendObj.syncGames()
+                return time.time() - start
+            finally:
+                transport.close()
+
+        elapsed = asyncio.run(sync())
+
+        self.assertEqual(self.server.statuses, [200, 304, 304])
+        self.assertLess(elapsed, 1)
+
+        # The connection is kept alive after a 304, so only one is opened.
+        self.assertEqual(self.server.connections, 1)
+
+class AsyncTransportTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer()
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def testInterimResponsesAreSkipped(self):
+        transport = AsyncTransport(timeout=3)
+
+        async def requests():
+            try:
+                first = await transport.request(self.server.url + 'interim/done')
+                second = await transport.request(self.server.url + 'echo/next')
+                return first, second
+            finally:
+                transport.close()
+
+        (response, content), (nextResponse, nextContent) = asyncio.run(requests())
+
+        self.assertEqual((response.status, content), (200, b'done'))
+        self.assertNotIn('link', response)
+        self.assertEqual((nextResponse.status, nextContent), (200, b'next'))
+        self.assertEqual(self.server.connections, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Tests for Fiend's syncing and replay of games, on games from synthgames.
+
+import io
+import re
+import unittest
+
+import synthgames
+from fiend import Fiend, GAMES_SINCE_START, SKIPPED_CHECKS, VALIDATE_FULL, VALIDATE_CHECKSUM, VALIDATE_TRUSTED
+
+class SyncGamesTest(unittest.TestCase):
+    def testInvitationGetsOpponentOnMerge(self):
+        # Game 5 is between users 10 and 11, and user 11 is the current user.
+        content = synthgames.gameXml(5, 12345, 6)
+        opponentUser = '<user><id>11</id><name>user11</name></user>'
+        self.assertIn(opponentUser, content)
+
+        # As an invitation, the game only has its creator and their first move.
+        invitation = content.replace(opponentUser, '')
+        invitation = re.sub('<moves>(<move>.*?</move>).*</moves>', r'<moves>\1</moves>', invitation)
+
+        for lazy in [False, True]:
+            fiendObj = Fiend('test@example.com', 'test', lazy=lazy)
+            fiendObj.userId = 11
+            fiendObj._mergeGames(io.BytesIO(('<games>' + invitation + '</games>').encode('utf-8')))
+
+            game = fiendObj._games[5]
+            self.assertEqual(game.opponent.id, None)
+            self.assertEqual(len(game.moves), 1)
+
+            fiendObj._mergeGames(io.BytesIO(('<games>' + content + '</games>').encode('utf-8')))
+
+            fresh = Fiend('test@example.com', 'test')
+            fresh.userId = 11
+            fresh._mergeGames(io.BytesIO(('<games>' + content + '</games>').encode('utf-8')))
+            expected = fresh._games[5]
+
+            self.assertEqual((game.opponent.id, game.opponent.name), (11, 'user11'))
+            self.assertIs(game.player, game.opponent)
+            self.assertEqual(len(game.moves), len(expected.moves))
+            self.assertEqual(game.boardString, expected.boardString)
+
+            for user, expectedUser in [(game.creator, expected.creator), (game.opponent, expected.opponent)]:
+                self.assertEqual((user.id, user.score, user.rack), (expectedUser.id, expectedUser.score, expectedUser.rack))
+
+    def testWatermarksWaitForWholeResponse(self):
+        games = [synthgames.gameXml(gameId, 1000 + gameId, 6) for gameId in [3, 2, 1]]
+        # The first play of game 2 gets a checksum that's off by one.
+        checksum = re.search('<board-checksum>(-?[1-9][0-9]*)</board-checksum>', games[1])
+        badGames = list(games)
+        badGames[1] = games[1].replace(checksum.group(0), '<board-checksum>%d</board-checksum>' % (int(checksum.group(1)) + 1), 1)
+
+        fiendObj = Fiend('test@example.com', 'test')
+        fiendObj.userId = 6
+        self.assertRaises(Fiend.MoveError, fiendObj._mergeGames, _gamesSource(badGames))
+        self.assertEqual(sorted(fiendObj._games), [3])
+        self.assertEqual((fiendObj._gamesSince, fiendObj._movesSince), (GAMES_SINCE_START, 0))
+
+        fiendObj._mergeGames(_gamesSource(games))
+        self.assertEqual(sorted(fiendObj._games), [1, 2, 3])
+        self.assertEqual((fiendObj._gamesSince, fiendObj._movesSince), ('2011-02-04T00:06:00Z', 3005))
+
+    def testWatermarksCompareTimes(self):
+        # 01:00 at +05:00 is before 00:06 UTC, and a game without a created-at
+        # doesn't move the watermark at all.
+        game = synthgames.gameXml(3, 1003, 6)
+        early = synthgames.gameXml(2, 1002, 1).replace('2011-02-03T00:00:00Z', '2011-02-04T01:00:00+05:00')
+        early = early.replace('2011-02-03T00:01:00Z', '2011-02-04T01:01:00+05:00')
+        missing = re.sub('<created-at>[^<]*</created-at>', '', synthgames.gameXml(1, 1001, 1))
+
+        fiendObj = Fiend('test@example.com', 'test')
+        fiendObj.userId = 6
+        fiendObj._mergeGames(_gamesSource([game, early, missing]))
+        self.assertEqual(sorted(fiendObj._games), [1, 2, 3])
+        self.assertEqual(fiendObj._gamesSince, '2011-02-04T00:06:00Z')
+
+class ValidationTest(unittest.TestCase):
+    def testUnknownLevels(self):
+        self.assertRaises(ValueError, Fiend, 'test@example.com', 'test', validation='none')
+
+        fiendObj = Fiend('test@example.com', 'test')
+        self.assertRaises(ValueError, setattr, fiendObj, 'validation', 'none')
+        self.assertEqual(fiendObj.validation, VALIDATE_FULL)
+
+        game = Fiend.Game()
+        self.assertRaises(ValueError, setattr, game, 'validation', 'none')
+        game.validation = VALIDATE_TRUSTED
+        game.validation = None
+        self.assertEqual(game.validationLevel, VALIDATE_FULL)
+
+    def testSkippedChecks(self):
+        content = ('<games>' + synthgames.gameXml(1, 777, 8) + '</games>').encode('utf-8')
+
+        for level in [VALIDATE_FULL, VALIDATE_CHECKSUM, VALIDATE_TRUSTED]:
+            fiendObj = Fiend('test@example.com', 'test', validation=level)
+            fiendObj._mergeGames(io.BytesIO(content))
+            numMoves = len(fiendObj._games[1].moves)
+
+            self.assertEqual(fiendObj.skippedChecks, dict([(check, numMoves) for check in SKIPPED_CHECKS[level]]))
+
+    def testFailedMovesRollBack(self):
+        for level in [VALIDATE_FULL, VALIDATE_CHECKSUM, VALIDATE_TRUSTED]:
+            game = Fiend.Game()
+            game._updateBoard(_move(7, 7, 9, 7, '58,15,52,'), level)
+            cells = game.board.cells.tolist()
+            checksum = game.board.checksum
+            boardString = game.boardString
+
+            # The last tile isn't a letter, so the move fails after the first
+            # two have been placed.
+            self.assertRaises(IndexError, game._updateBoard, _move(2, 2, 4, 2, '20,21,110,'), level)
+            self.assertEqual(game.board.cells.tolist(), cells)
+            self.assertEqual(game.board.checksum, checksum)
+            self.assertEqual(game.boardString, boardString)
+
+class ForkTest(unittest.TestCase):
+    def setUp(self):
+        fiendObj = Fiend('test@example.com', 'test')
+        fiendObj._mergeGames(io.BytesIO(synthgames.gamesXml(10, 9).encode('utf-8')))
+
+        # Move 12 of game 4 is a swap, and move 13 is a play.
+        self.game = fiendObj._games[4]
+        self.assertEqual([moveObj.fromX for moveObj in self.game.moves[12:14]], [101, 9])
+
+    def copyMove(self, moveIndex):
+        moveObj = Fiend.Move()
+        moveObj.setWithRow(self.game.moves[moveIndex].row)
+        return moveObj
+
+    def snapshot(self, game):
+        return (game.board.cells.tolist(), game.board.checksum, game.boardChecksum, game.boardString,
+                list(game.letterBag), game._random.getstate(), game.remainingLetterCodes,
+                list(game.creator.rack), list(game.opponent.rack), game.creator.score, game.opponent.score,
+                len(game.moves))
+
+    def testForksLeaveParentAlone(self):
+        for moveIndex in [12, 13]:
+            parent = self.game.fork(moveIndex - 1)
+            before = self.snapshot(parent)
+
+            child = parent.fork()
+            child.addMove(self.copyMove(moveIndex))
+
+            self.assertEqual(self.snapshot(parent), before)
+            self.assertEqual(self.snapshot(child), self.snapshot(self.game.fork(moveIndex)))
+            self.assertNotEqual(self.snapshot(child), before)
+
+    def testScoreMoveLeavesMoveAlone(self):
+        parent = self.game.fork(12)
+        before = self.snapshot(parent)
+
+        moveObj = self.copyMove(13)
+        moveObj.promoted = None
+        moveObj.boardChecksum = None
+        points, words = parent.scoreMove(moveObj)
+
+        self.assertEqual((moveObj.promoted, moveObj.boardChecksum), (None, None))
+        self.assertEqual(self.snapshot(parent), before)
+        self.assertEqual((points, words), (self.game.moves[13].score, self.game.moves[13].words))
+
+        # The move can still be played afterwards.
+        parent.fork().addMove(moveObj)
+        self.assertEqual((moveObj.score, moveObj.promoted, moveObj.boardChecksum),
+                         (points, self.game.moves[13].promoted, self.game.moves[13].boardChecksum))
+
+def _gamesSource(games):
+    return io.BytesIO(('<games>' + ''.join(games) + '</games>').encode('utf-8'))
+
+def _move(fromX, fromY, toX, toY, text):
+    moveObj = Fiend.Move()
+    moveObj.fromX, moveObj.fromY, moveObj.toX, moveObj.toY = fromX, fromY, toX, toY
+    moveObj.text = text
+    return moveObj
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Tests that LetterBag draws tiles in exactly the order of the frozen list bag
+# in oldletterbag, through draws, swaps and copies.
+
+import copy
+import random
+import unittest
+
+from fiend import LETTER_MAP
+from letterbag import LetterBag, MAX_RETURNED
+from mersenne import Mersenne
+from tests.oldletterbag import drawFromLetterBag, putInLetterBag
+from tests.oldmersenne import OldMersenne
+
+class LetterBagTest(unittest.TestCase):
+    def setUp(self):
+        self.codes = list(range(len(LETTER_MAP)))
+
+    def assertBag(self, bag, oldBag):
+        self.assertEqual(list(bag), oldBag)
+        self.assertEqual(len(bag), len(oldBag))
+
+    def testDrawsMatchOld(self):
+        for seed in [1, 4357, 98765]:
+            bag, oldBag = LetterBag(self.codes), self.codes[:]
+            rng, oldRng = Mersenne(seed), OldMersenne(seed)
+
+            # Racks, then plays of a few tiles until the bag runs out, and one
+            # more draw from the empty bag.
+            for num in [7, 7] + [3, 1, 7, 2, 5, 4] * 20:
+                self.assertEqual(bag.draw(num, rng), drawFromLetterBag(oldBag, num, oldRng))
+                self.assertBag(bag, oldBag)
+
+            self.assertEqual(len(bag), 0)
+
+    def testSwapsMatchOld(self):
+        # Each swap draws tiles and then puts as many back, so the returned
+        # tiles pile up past MAX_RETURNED and the tree is rebuilt, several
+        # times over.
+        chooser = random.Random(5)
+
+        for seed in [2, 31337]:
+            bag, oldBag = LetterBag(self.codes), self.codes[:]
+            rng, oldRng = Mersenne(seed), OldMersenne(seed)
+            rack = drawFromLetterBag(oldBag, 7, oldRng)
+            self.assertEqual(bag.draw(7, rng), rack)
+            numReturned = 0
+
+            for turn in range(60):
+                tiles = chooser.sample(rack, chooser.randint(1, 7))
+                drawn = drawFromLetterBag(oldBag, len(tiles), oldRng)
+                self.assertEqual(bag.draw(len(tiles), rng), drawn)
+
+                for tile in tiles:
+                    rack.remove(tile)
+                    bag.put(tile)
+                    putInLetterBag(oldBag, tile)
+
+                rack.extend(drawn)
+                numReturned += len(tiles)
+                self.assertBag(bag, oldBag)
+
+            self.assertTrue(numReturned > 10 * MAX_RETURNED)
+
+    def testReturnedTilesAreDrawn(self):
+        # Just under and just over MAX_RETURNED tiles are returned to a nearly
+        # empty bag, so the draws come from the returned list itself.
+        for numReturned in [MAX_RETURNED, MAX_RETURNED + 1]:
+            bag, oldBag = LetterBag(self.codes), self.codes[:]
+            rng, oldRng = Mersenne(11), OldMersenne(11)
+            drawn = drawFromLetterBag(oldBag, len(oldBag) - 3, oldRng)
+            self.assertEqual(bag.draw(len(drawn), rng), drawn)
+
+            for tile in drawn[:numReturned]:
+                bag.put(tile)
+                putInLetterBag(oldBag, tile)
+
+            self.assertEqual(bag.draw(len(oldBag), rng), drawFromLetterBag(oldBag, len(oldBag), oldRng))
+
+    def testCopiesAreIndependent(self):
+        bag, oldBag = LetterBag(self.codes), self.codes[:]
+        rng, oldRng = Mersenne(3), OldMersenne(3)
+        self.assertEqual(bag.draw(20, rng), drawFromLetterBag(oldBag, 20, oldRng))
+        bag.put(5)
+        putInLetterBag(oldBag, 5)
+
+        other = copy.copy(bag)
+        otherRng = copy.copy(rng)
+        other.draw(30, otherRng)
+        for tile in range(MAX_RETURNED + 2):
+            other.put(tile)
+
+        self.assertBag(bag, oldBag)
+        self.assertEqual(bag.draw(40, rng), drawFromLetterBag(oldBag, 40, oldRng))
+        self.assertBag(bag, oldBag)
+
+if __name__ == '__main__':
+    unittest.main()
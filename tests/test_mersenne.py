@@ -0,0 +1,124 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Tests that Mersenne gives exactly the values of the frozen generator in
+# oldmersenne, with and without NumPy, however they're read.
+
+import copy
+import unittest
+
+import mersenne
+from mersenne import Mersenne, N
+from tests.oldmersenne import oldValues
+
+SEEDS = [0, 1, 4357, 12345, 0xffffffff, 2**40 + 7]
+
+# Enough values for several twists.
+NUM_VALUES = 4 * N + 11
+
+class MersenneTest(unittest.TestCase):
+    def generators(self, seed):
+        # One generator for each way of refreshing the state that can be used.
+        useNumpys = [False] if mersenne.numpy is None else [False, True]
+        return [Mersenne(seed, useNumpy) for useNumpy in useNumpys]
+
+    def testRandMatchesOld(self):
+        for seed in SEEDS:
+            expected = oldValues(seed, NUM_VALUES)
+
+            for random in self.generators(seed):
+                self.assertEqual([random.rand() for i in range(NUM_VALUES)], expected)
+
+    def testRandArrayMatchesOld(self):
+        # Reads that start and end in the middle of blocks, span several
+        # blocks, and are mixed with rand().
+        sizes = [1, N - 2, 1, 700, 0, 5, 2 * N + 3, N]
+
+        for seed in SEEDS:
+            expected = oldValues(seed, sum(sizes) + 1)
+
+            for random in self.generators(seed):
+                values = []
+                for size in sizes:
+                    values.extend(random.randArray(size))
+
+                values.append(random.rand())
+                self.assertEqual(values, expected)
+
+    @unittest.skipIf(mersenne.numpy is None, 'NumPy is not installed')
+    def testTwistNumpyMatchesTwist(self):
+        for seed in SEEDS:
+            plain = Mersenne(seed, useNumpy=False)
+            vectorised = Mersenne(seed, useNumpy=True)
+
+            for i in range(4):
+                plain._twist()
+                vectorised._twistNumpy()
+                self.assertEqual(list(vectorised.mt[:N]), plain.mt[:N])
+
+    def testSkipMatchesOld(self):
+        # Skips from the start, and from part way through a block, that land
+        # in the same block, on block edges, and several blocks ahead.
+        for start in [0, 1, 100, N - 1, N]:
+            for num in [0, 1, N - start - 1, N - start, N - start + 1, N, 2 * N + 17, 3 * N]:
+                if num < 0:
+                    continue
+
+                expected = oldValues(4357, start + num + 3)[start + num:]
+
+                for random in self.generators(4357):
+                    random.randArray(start)
+                    random.skip(num)
+                    self.assertEqual([random.rand() for i in range(3)], expected)
+
+    def testStateRoundTrip(self):
+        expected = oldValues(99, 3 * N)
+
+        for random in self.generators(99):
+            for position in [0, 1, N - 1, N, N + 5, 2 * N]:
+                fresh = Mersenne(99, random.useNumpy)
+                fresh.randArray(position)
+                state = fresh.getstate()
+
+                fresh.randArray(N)
+
+                # The state can be put back into the same generator, or into
+                # one that refreshes its state the other way.
+                for other in [fresh] + self.generators(1):
+                    other.setstate(state)
+                    self.assertEqual(other.randArray(N), expected[position:position + N])
+
+    def testCopiesAreIndependent(self):
+        expected = oldValues(7, 3 * N)
+
+        for random in self.generators(7):
+            random.randArray(N - 3)
+            other = copy.copy(random)
+
+            # The copy goes through several twists before the original is read.
+            self.assertEqual(other.randArray(2 * N), expected[N - 3:3 * N - 3])
+            self.assertEqual(random.randArray(2 * N), expected[N - 3:3 * N - 3])
+            self.assertEqual(copy.deepcopy(random).rand(), expected[3 * N - 3])
+
+if __name__ == '__main__':
+    unittest.main()
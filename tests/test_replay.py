@@ -0,0 +1,67 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Tests that replayGames gives the same results in this process and across a
+# pool of workers, on games from synthgames and some that can't be replayed.
+
+import io
+import re
+import unittest
+
+import replay
+import synthgames
+from fiend import Fiend
+
+class ReplayGamesTest(unittest.TestCase):
+    def setUp(self):
+        games = [synthgames.gameXml(gameId, 2000 + gameId, 8) for gameId in range(1, 13)]
+
+        # A random seed that isn't a number, and a move with a bad checksum.
+        games[3] = games[3].replace('<random-seed>', '<random-seed>x')
+        checksum = re.search('<board-checksum>(-?[1-9][0-9]*)</board-checksum>', games[7])
+        games[7] = games[7].replace(checksum.group(0), '<board-checksum>%d</board-checksum>' % (int(checksum.group(1)) + 1), 1)
+
+        # Some of the games are given as rows rather than XML.
+        fiendObj = Fiend('test@example.com', 'test', lazy=True)
+        fiendObj._mergeGames(io.BytesIO(('<games>' + ''.join(games[8:]) + '</games>').encode('utf-8')))
+
+        self.games = games[:8] + [(game.id, game.randomSeed, (game.creator.id, game.opponent.id), game.moveRows)
+                                  for game in sorted(fiendObj._games.values(), key=lambda game: game.id)]
+
+    def testWorkersMatchInProcess(self):
+        expected = list(replay.replayGames(self.games, workers=1, chunkSize=5))
+        results = list(replay.replayGames(self.games, workers=2, chunkSize=5))
+
+        self.assertEqual(results, expected)
+        self.assertEqual([result.gameId for result in results], list(range(1, 13)))
+
+    def testErrorsAreKeptPerGame(self):
+        results = list(replay.replayGames(self.games, workers=1))
+
+        self.assertEqual([result.gameId for result in results if result.error is not None], [4, 8])
+        self.assertEqual(results[3].error[0], 0)
+        self.assertTrue(results[3].error[1].startswith('ValueError'))
+        self.assertEqual(results[7].error[1], 'Board checksum mismatch')
+
+if __name__ == '__main__':
+    unittest.main()
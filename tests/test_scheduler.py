@@ -0,0 +1,135 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Tests for the order Scheduler polls accounts in, with stand-in accounts and
+# a stand-in clock that each poll moves on.
+
+import unittest
+
+import scheduler
+from scheduler import Scheduler
+
+class StandInClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        # Time passes a little with every reading, so that the rate limit's
+        # tokens come back.
+        self.now += 0.001
+        return self.now
+
+class StandInFiend(object):
+    def __init__(self, clock, waiting, games=None):
+        self.clock = clock
+        self.transport = None
+        self.opponentMoveGames = [1] if waiting else []
+        self._games = games or {}
+        self.calls = []
+
+    @property
+    def games(self):
+        self.calls.append('games')
+        self.clock.now += 0.1
+        return self._games
+
+    def syncGames(self):
+        self.calls.append('syncGames')
+        self.clock.now += 0.1
+
+class SchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.savedClock = scheduler.clock
+        self.clock = scheduler.clock = StandInClock()
+
+    def tearDown(self):
+        scheduler.clock = self.savedClock
+
+    def poll(self, schedulerObj, numPolls):
+        counts = {}
+
+        for i in range(numPolls):
+            fiend = schedulerObj.pollNext(block=False)
+            if fiend is None:
+                self.clock.now += 0.01
+            else:
+                counts[id(fiend)] = counts.get(id(fiend), 0) + 1
+
+        return counts
+
+    def testWaitingAccountsGoFirst(self):
+        schedulerObj = Scheduler(transport=object(), rate=1000, minInterval=1, idleInterval=1)
+        idle = StandInFiend(self.clock, False)
+        waiting = StandInFiend(self.clock, True)
+        schedulerObj.addAccount(idle)
+        schedulerObj.addAccount(waiting)
+
+        # Both accounts become due at the same time after their first polls.
+        self.poll(schedulerObj, 2)
+        self.clock.now += 5
+        self.assertIs(schedulerObj.pollNext(block=False), waiting)
+        self.assertIs(schedulerObj.pollNext(block=False), idle)
+
+    def testIdleAccountsAreNotStarved(self):
+        # Four waiting accounts are due more often than the polls can keep up
+        # with, but the idle ones still get their turns.
+        schedulerObj = Scheduler(transport=object(), rate=1000, minInterval=0.2, idleInterval=0.2)
+        waiting = [StandInFiend(self.clock, True) for i in range(4)]
+        idle = [StandInFiend(self.clock, False) for i in range(2)]
+
+        for fiend in waiting + idle:
+            schedulerObj.addAccount(fiend)
+
+        counts = self.poll(schedulerObj, 300)
+        self.assertEqual(sum(counts.values()), 300)
+
+        for fiend in idle:
+            self.assertTrue(counts.get(id(fiend), 0) >= 30)
+
+        for fiend in waiting:
+            self.assertTrue(counts[id(fiend)] >= max([counts.get(id(idleFiend), 0) for idleFiend in idle]))
+
+    def testLoadedAccountsOnlySync(self):
+        schedulerObj = Scheduler(transport=object(), rate=1000)
+        loaded = StandInFiend(self.clock, False, {1: None})
+        fresh = StandInFiend(self.clock, False)
+        schedulerObj.addAccount(loaded)
+        schedulerObj.addAccount(fresh)
+
+        self.poll(schedulerObj, 2)
+        self.assertEqual(loaded.calls, ['syncGames'])
+        self.assertEqual(fresh.calls, ['games'])
+
+    def testRemovedAccountsAreSkipped(self):
+        schedulerObj = Scheduler(transport=object(), rate=1000)
+        fiends = [StandInFiend(self.clock, True) for i in range(3)]
+
+        for fiend in fiends:
+            schedulerObj.addAccount(fiend)
+
+        schedulerObj.removeAccount(fiends[0])
+        self.assertEqual(sorted(self.poll(schedulerObj, 2)), sorted([id(fiends[1]), id(fiends[2])]))
+        self.assertEqual(schedulerObj.pollNext(block=False), None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Differential tests of Game's move scoring against the frozen list-of-lists
+# kernel in oldscoring, over games from synthgames and hand-built moves at
+# the edges of the rules.
+
+import io
+import unittest
+
+import synthgames
+from fiend import Fiend, LETTER_MAP
+from tests.oldscoring import OldMoveError, emptyBoard, updateBoard, calculateBoardChecksum
+
+def code(letter, n=0):
+    # The code of the nth tile of a letter.
+    return LETTER_MAP.index(letter) + n
+
+def text(*tiles):
+    # A move's text from tile codes, '*' for tiles already on the board, and
+    # the letters that blanks are played as.
+    return ''.join([str(tile) + ',' for tile in tiles])
+
+class ScoringTest(unittest.TestCase):
+    def setUp(self):
+        self.game = Fiend.Game()
+        self.board = emptyBoard()
+        self.blanks = [None, None]
+
+    def play(self, fromX, fromY, toX, toY, moveText, promoted=None, boardChecksum=None, error=None):
+        '''
+        Plays a move with both kernels, checks that they agree, and that the
+        move raised the given error, or was played if there isn't one.
+        Returns the result.
+        '''
+
+        moveObj = Fiend.Move()
+        moveObj.fromX, moveObj.fromY, moveObj.toX, moveObj.toY = fromX, fromY, toX, toY
+        moveObj.text = moveText
+        moveObj.promoted = promoted
+        moveObj.boardChecksum = boardChecksum
+
+        try:
+            numLettersPlayed, wordPoints, wordsPlayed, passedTurn = self.game._updateBoard(moveObj)
+            result = (numLettersPlayed, wordPoints, wordsPlayed, moveObj.promoted, moveObj.boardChecksum)
+        except Fiend.MoveError as e:
+            result = e.msg
+
+        try:
+            self.board, self.blanks, expected = updateBoard(self.board, self.blanks, fromX, fromY, toX, toY,
+                                                            moveText, promoted, boardChecksum)
+        except OldMoveError as e:
+            expected = e.args[0]
+
+        self.assertEqual(result, expected)
+        self.assertBoard()
+
+        if error is None:
+            self.assertIsInstance(result, tuple)
+        else:
+            self.assertEqual(result, error)
+
+        return result
+
+    def assertBoard(self):
+        self.assertEqual([[self.game.board[x][y] for y in range(15)] for x in range(15)], self.board)
+        self.assertEqual(self.game.board.checksum, calculateBoardChecksum(self.board))
+        self.assertEqual(self.game._blanks, self.blanks)
+
+    def testSyntheticGames(self):
+        fiendObj = Fiend('test@example.com', 'test')
+        fiendObj._mergeGames(io.BytesIO(synthgames.gamesXml(40, 11).encode('utf-8')))
+        numPlays = 0
+
+        for game in fiendObj._games.values():
+            board = emptyBoard()
+            blanks = [None, None]
+
+            for moveObj in game.moves:
+                if moveObj.fromX > 14:
+                    continue
+
+                board, blanks, expected = updateBoard(board, blanks, moveObj.fromX, moveObj.fromY, moveObj.toX,
+                                                      moveObj.toY, moveObj.text, moveObj.promoted, moveObj.boardChecksum)
+                numLettersPlayed, wordPoints, wordsPlayed, promoted, boardChecksum = expected
+
+                self.assertEqual((moveObj.score, moveObj.words, moveObj.promoted, moveObj.boardChecksum),
+                                 (wordPoints, wordsPlayed, promoted, boardChecksum))
+                numPlays += 1
+
+            self.assertEqual([[game.board[x][y] for y in range(15)] for x in range(15)], board)
+
+        self.assertTrue(numPlays > 500)
+
+    def testOneTilePlaysAtEdges(self):
+        # Corners, with nothing around them.
+        self.play(0, 0, 0, 0, text(code('A')))
+        self.play(14, 14, 14, 14, text(code('E')))
+        self.play(14, 0, 14, 0, text(code('I')))
+        self.play(0, 14, 0, 14, text(code('O')))
+
+        # Next to a corner tile, down and across.
+        self.play(0, 1, 0, 1, text(code('T')))
+        self.play(1, 0, 1, 0, text(code('N')))
+        self.play(14, 13, 14, 13, text(code('R')))
+        self.play(13, 14, 13, 14, text(code('S')))
+
+        # At the top and bottom of a column with a tile at the other end.
+        self.play(5, 14, 5, 14, text(code('D')))
+        self.play(5, 0, 5, 0, text(code('L')))
+        self.play(9, 0, 9, 0, text(code('U')))
+        self.play(9, 14, 9, 14, text(code('G')))
+
+    def testLinesAlongEdges(self):
+        self.play(0, 3, 0, 7, text(code('S'), code('T'), code('O'), code('N'), code('E')))
+        self.play(1, 7, 4, 7, text(code('A'), code('R'), code('T'), code('E', 1)))
+        self.play(14, 0, 14, 6, text(code('Q'), code('U'), code('A'), code('R'), code('T'), code('E'), code('R')))
+        self.play(8, 14, 14, 14, text(code('B'), code('L'), code('A', 1), code('Z'), code('I'), code('N'), code('G')))
+        self.play(0, 2, 0, 8, text(code('A', 2), '*', '*', '*', '*', '*', code('S', 1)))
+
+    def testBlanks(self):
+        self.play(7, 7, 9, 7, text(code('C'), 0, 'A', code('T')))
+        self.play(8, 6, 8, 8, text(code('H'), '*', code('T', 1)))
+        self.play(10, 5, 10, 9, text(1, 'S', code('P'), code('O'), code('R'), code('E')))
+        self.play(6, 7, 11, 7, text(code('S'), '*', '*', '*', '*', code('E', 2)))
+        self.assertEqual(self.blanks, ['A', 'S'])
+
+    def testOverlap(self):
+        self.play(7, 7, 9, 7, text(code('C'), code('A'), code('T')))
+        self.play(8, 6, 8, 8, text(code('H'), code('A', 1), code('T', 1)), error='Move illegally overlaps an existing move')
+        self.play(9, 7, 9, 7, text(code('S')), error='Move illegally overlaps an existing move')
+
+    def testBadChecksum(self):
+        self.play(7, 7, 9, 7, text(code('C'), code('A'), code('T')))
+        self.play(7, 8, 9, 8, text(code('O'), code('R'), code('E')), boardChecksum=12345, error='Board checksum mismatch')
+
+        # The same move with the right checksum, after the bad one was rolled back.
+        result = self.play(7, 8, 9, 8, text(code('O'), code('R'), code('E')))
+        self.play(7, 9, 9, 9, text(code('D'), code('O', 1), code('E', 1)), boardChecksum=result[4] ^ 2,
+                  error='Board checksum mismatch')
+
+    def testBadPromoted(self):
+        self.play(7, 7, 9, 7, text(code('C'), code('A'), code('T')), promoted=2, error='Promoted value mismatch')
+        self.play(7, 7, 7, 7, text(code('A')), promoted=1, error='Promoted value mismatch')
+        self.play(7, 7, 9, 7, text(code('C'), code('A'), code('T')), promoted=1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Tests that MoveStats gives the same answers with and without NumPy, on
+# games from synthgames.
+
+import io
+import unittest
+
+import stats
+import synthgames
+from fiend import Fiend
+
+class MoveStatsTest(unittest.TestCase):
+    def setUp(self):
+        self.stats = stats.MoveStats()
+        fiendObj = Fiend('test@example.com', 'test', stats=self.stats)
+        fiendObj._mergeGames(io.BytesIO(synthgames.gamesXml(30, 3).encode('utf-8')))
+        self.userId = fiendObj._games[1].creator.id
+
+    def withoutNumpy(self, function, *args):
+        savedNumpy = stats.numpy
+        stats.numpy = None
+
+        try:
+            return function(*args)
+        finally:
+            stats.numpy = savedNumpy
+
+    @unittest.skipIf(stats.numpy is None, 'NumPy is not installed')
+    def testScoreDistribution(self):
+        for regionSize in [1, 2, 3, 4, 5, 7, 15]:
+            expected = self.withoutNumpy(self.stats.scoreDistribution, regionSize)
+            self.assertTrue(expected)
+            self.assertEqual(self.stats.scoreDistribution(regionSize), expected)
+
+    @unittest.skipIf(stats.numpy is None, 'NumPy is not installed')
+    def testAverageScoreByOpponent(self):
+        expected = self.withoutNumpy(self.stats.averageScoreByOpponent, self.userId)
+        self.assertEqual(_rounded(self.stats.averageScoreByOpponent(self.userId)), _rounded(expected))
+
+    @unittest.skipIf(stats.numpy is None, 'NumPy is not installed')
+    def testBingoRate(self):
+        expected = self.withoutNumpy(self.stats.bingoRate)
+        self.assertEqual(_rounded(self.stats.bingoRate()), _rounded(expected))
+
+    def testLazyFiendFillsStats(self):
+        # Stats are built as moves are replayed, so a lazy Fiend with stats
+        # has to replay them straight away.
+        lazyStats = stats.MoveStats()
+        fiendObj = Fiend('test@example.com', 'test', lazy=True, stats=lazyStats)
+        fiendObj._mergeGames(io.BytesIO(synthgames.gamesXml(30, 3).encode('utf-8')))
+
+        self.assertTrue(len(self.stats) > 0)
+        for field, typecode in stats.STATS_FIELDS:
+            self.assertEqual(getattr(lazyStats, field), getattr(self.stats, field))
+
+def _rounded(values):
+    return dict([(key, round(value, 9)) for key, value in values.items()])
+
+if __name__ == '__main__':
+    unittest.main()
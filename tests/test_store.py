@@ -0,0 +1,171 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Tests for GameStore warm starts, on games from synthgames.
+
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+import stats
+import synthgames
+from fiend import Fiend, MOVE_ROW_FIELDS
+from store import GameStore
+from wordindex import WordIndex
+
+class GameStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'games.db')
+        self.content = synthgames.gamesXml(20, 5).encode('utf-8')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def sync(self, **kwargs):
+        store = GameStore(self.path)
+        fiendObj = Fiend('test@example.com', 'test', store=store, **kwargs)
+        fiendObj._mergeGames(io.BytesIO(self.content))
+        store.close()
+        return fiendObj
+
+    def load(self, **kwargs):
+        store = GameStore(self.path)
+        fiendObj = Fiend('test@example.com', 'test', store=store, **kwargs)
+        fiendObj._loadStore()
+        store.close()
+        return fiendObj
+
+    def testWarmStartMatchesReplay(self):
+        cold = self.sync()
+        warm = self.load()
+
+        self.assertEqual(sorted(warm._games.keys()), sorted(cold._games.keys()))
+
+        for gameId, game in cold._games.items():
+            self.assertEqual(_summary(warm._games[gameId]), _summary(game))
+
+    def testWarmStartPutsOffReplay(self):
+        self.sync()
+        warm = self.load()
+
+        for game in warm._games.values():
+            self.assertEqual(game._moves, [])
+            self.assertTrue(game._pendingMoves)
+
+        # Using a game replays only that game.
+        game = list(warm._games.values())[0]
+        game.board
+        self.assertEqual(game._pendingMoves, [])
+        self.assertTrue(list(warm._games.values())[1]._pendingMoves)
+
+    def testLazySyncSavesWithoutReplay(self):
+        cold = self.sync(lazy=True)
+
+        for game in cold._games.values():
+            self.assertEqual(game._moves, [])
+
+        warm = self.load()
+        fresh = Fiend('test@example.com', 'test')
+        fresh._mergeGames(io.BytesIO(self.content))
+
+        for gameId, game in fresh._games.items():
+            self.assertEqual(_summary(warm._games[gameId]), _summary(game))
+
+    def testWarmStartReadsResults(self):
+        cold = self.sync()
+        warm = self.load()
+
+        for gameId, game in cold._games.items():
+            warmGame = warm._games[gameId]
+            self.assertEqual(warmGame.moveResultRows, [move.resultRow for move in game.moves])
+
+            lastMove = len(game.moves) - 1
+            self.assertEqual(warmGame.randomAt(lastMove).getstate(), game.randomAt(lastMove).getstate())
+            self.assertEqual(warmGame._moves, [])
+
+    def testWarmStartFillsStatsWithoutReplay(self):
+        cold = self.sync(stats=stats.MoveStats(), wordIndex=WordIndex())
+        warm = self.load(stats=stats.MoveStats(), wordIndex=WordIndex())
+
+        for game in warm._games.values():
+            self.assertEqual(game._moves, [])
+
+        for field, typecode in stats.STATS_FIELDS:
+            self.assertEqual(getattr(warm.stats, field), getattr(cold.stats, field))
+
+        self.assertEqual(sorted(warm.wordIndex), sorted(cold.wordIndex))
+        for word in cold.wordIndex:
+            self.assertEqual(warm.wordIndex.lookup(word), cold.wordIndex.lookup(word))
+
+        # Replaying the games afterwards doesn't add their moves again.
+        for game in warm._games.values():
+            game.board
+
+        self.assertEqual(len(warm.stats), len(cold.stats))
+
+    def testResultsAreSavedOnceReplayed(self):
+        self.sync(lazy=True)
+
+        store = GameStore(self.path)
+        fiendObj = Fiend('test@example.com', 'test', store=store)
+        fiendObj._loadStore()
+        self.assertEqual(set([row for game in fiendObj._games.values() for row in game.moveResultRows]),
+                         set([(None, None, None)]))
+
+        for game in fiendObj._games.values():
+            game.board
+            store.saveGame(game)
+
+        store.commit()
+        store.close()
+
+        cold = Fiend('test@example.com', 'test')
+        cold._mergeGames(io.BytesIO(self.content))
+        warm = self.load()
+
+        for gameId, game in cold._games.items():
+            self.assertEqual(warm._games[gameId].moveResultRows, [move.resultRow for move in game.moves])
+
+    def testStoreWithoutResultColumns(self):
+        db = sqlite3.connect(self.path)
+        db.execute('CREATE TABLE moves (%s, PRIMARY KEY (gameId, moveIndex))' % ', '.join(MOVE_ROW_FIELDS))
+        db.commit()
+        db.close()
+
+        cold = self.sync()
+        warm = self.load()
+
+        for gameId, game in cold._games.items():
+            self.assertEqual(_summary(warm._games[gameId]), _summary(game))
+
+def _summary(game):
+    return (game.boardString, game.boardChecksum, game.creator.score, game.opponent.score,
+            list(game.creator.rack), list(game.opponent.rack), game.gameOver,
+            [(move.score, move.words, move.drawCount) for move in game.moves])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Tests for Transport's connection pool against a local stand-in server.
+
+import socket
+import time
+import unittest
+
+from tests.standinserver import StandInServer
+from transport import Transport
+
+class TransportTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer()
+        self.server.start()
+        self.transport = Transport(maxConnections=2, timeout=3)
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.stop()
+
+    def echo(self, text, delay=0):
+        return (self.server.url + 'echo/%s?delay=%s' % (text, delay), {})
+
+    def testConnectionsAreReused(self):
+        for i in range(5):
+            response, content = self.transport.request(*self.echo(i))
+            self.assertEqual((response.status, content), (200, str(i).encode('utf-8')))
+
+        self.assertEqual(self.server.connections, 1)
+
+    def testRequestManyKeepsOrder(self):
+        # The earlier requests take longer, so they finish last.
+        requests = [self.echo(i, (8 - i) * 0.03) for i in range(8)]
+        results = self.transport.requestMany(requests)
+
+        self.assertEqual([content for response, content in results], [str(i).encode('utf-8') for i in range(8)])
+
+        # No more than maxConnections requests were made at once, each on a
+        # connection of its own that was then kept for the next ones.
+        self.assertEqual(self.server.maxActive, 2)
+        self.assertEqual(self.server.connections, 2)
+
+    def testRequestTimeouts(self):
+        start = time.time()
+        self.assertRaises(socket.timeout, self.transport.request, *self.echo('slow', 2), timeout=0.2)
+        self.assertRaises(socket.timeout, self.transport.requestMany, [self.echo('slow', 2)], timeout=0.2)
+        self.assertLess(time.time() - start, 1.5)
+
+        # The timeout only applies to those requests, and the pool still works.
+        response, content = self.transport.request(*self.echo('late', 0.5))
+        self.assertEqual(content, b'late')
+        self.assertEqual([content for response, content in self.transport.requestMany([self.echo(1, 0.5)])], [b'1'])
+
+if __name__ == '__main__':
+    unittest.main()
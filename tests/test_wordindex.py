@@ -0,0 +1,63 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Tests for WordIndex, on games from synthgames.
+
+import io
+import unittest
+
+import synthgames
+from fiend import Fiend
+from wordindex import WordIndex
+
+class WordIndexTest(unittest.TestCase):
+    def testLazyFiendFillsIndex(self):
+        content = synthgames.gamesXml(20, 5).encode('utf-8')
+        indexes = []
+
+        for lazy in [False, True]:
+            wordIndex = WordIndex()
+            fiendObj = Fiend('test@example.com', 'test', lazy=lazy, wordIndex=wordIndex)
+            fiendObj._mergeGames(io.BytesIO(content))
+            indexes.append(wordIndex)
+
+        eager, lazy = indexes
+        self.assertTrue(len(eager) > 0)
+        self.assertEqual(sorted(lazy), sorted(eager))
+
+        for word in eager:
+            self.assertEqual(lazy.lookup(word), eager.lookup(word))
+
+    def testMovesAreAddedOnce(self):
+        wordIndex = WordIndex()
+        fiendObj = Fiend('test@example.com', 'test', wordIndex=wordIndex)
+        fiendObj._mergeGames(io.BytesIO(synthgames.gamesXml(5, 7).encode('utf-8')))
+        counts = dict([(word, wordIndex.count(word)) for word in wordIndex])
+
+        for game in fiendObj._games.values():
+            wordIndex.addGame(game)
+
+        self.assertEqual(dict([(word, wordIndex.count(word)) for word in wordIndex]), counts)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# A thread-safe HTTP transport with a bounded pool of persistent connections.
+# Each pooled httplib2.Http object keeps its connections alive between
+# requests, so several Fiend objects can share one Transport without each
+# of them opening its own connections.
+
+import gzip
+import io
+import threading
+import zlib
+from multiprocessing.pool import ThreadPool
+import httplib2
+
+try:
+    from queue import LifoQueue, Empty
+except ImportError:
+    from Queue import LifoQueue, Empty
+
+DEFAULT_MAX_CONNECTIONS = 4
+DEFAULT_TIMEOUT = 30
+
+# How many compressed bytes are decompressed at a time.
+DECODE_CHUNK_SIZE = 16 * 1024
+
+class Transport(object):
+    def __init__(self, maxConnections=DEFAULT_MAX_CONNECTIONS, timeout=DEFAULT_TIMEOUT):
+        '''
+        Params:
+            maxConnections - The most requests that can be in flight at once, and
+                             the most connections that are kept open per host.
+            timeout - The default socket timeout for a request, in seconds.
+        '''
+
+        self.maxConnections = maxConnections
+        self.timeout = timeout
+
+        # The most recently used connection is reused first, since it's the
+        # one least likely to have been closed by the server.
+        self._idle = LifoQueue()
+        self._slots = threading.BoundedSemaphore(maxConnections)
+        self._threads = None
+        self._lock = threading.Lock()
+
+    def request(self, url, headers=None, timeout=None):
+        '''
+        Makes a GET request and returns a (response, content) pair, like
+        httplib2.Http.request(). Blocks until a connection is free.
+        '''
+
+        http = self._acquire()
+
+        try:
+            self._setTimeout(http, self.timeout if timeout is None else timeout)
+            return http.request(url, headers=headers)
+        finally:
+            self._release(http)
+
+    def requestMany(self, requests, timeout=None):
+        '''
+        Makes several requests at once on a pool of threads, one for each
+        connection. requests is a list of (url, headers) pairs, and a list of
+        (response, content) pairs is returned in the same order.
+        '''
+
+        with self._lock:
+            if self._threads is None:
+                self._threads = ThreadPool(self.maxConnections)
+
+        return self._threads.map(lambda request: self.request(request[0], request[1], timeout), requests)
+
+    def close(self):
+        '''
+        Closes every idle connection and stops the request threads.
+        '''
+
+        with self._lock:
+            if self._threads is not None:
+                self._threads.close()
+                self._threads.join()
+                self._threads = None
+
+        while True:
+            try:
+                http = self._idle.get_nowait()
+            except Empty:
+                break
+
+            http.close()
+
+    def _acquire(self):
+        self._slots.acquire()
+
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            return httplib2.Http(timeout=self.timeout)
+
+    def _release(self, http):
+        self._idle.put(http)
+        self._slots.release()
+
+    def _setTimeout(self, http, timeout):
+        # New connections pick up the Http object's timeout, and ones that
+        # are already open have their sockets changed to match.
+        http.timeout = timeout
+
+        for conn in http.connections.values():
+            conn.timeout = timeout
+
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+
+def openContent(response, content):
+    '''
+    Returns a file-like object that reads the content of a response. If it has
+    a gzip or deflate Content-Encoding, it's decompressed a piece at a time as
+    it's read, so a parser reading from it never needs the whole of the
+    decompressed content in memory. httplib2 decompresses responses itself,
+    so this only matters for transports that don't.
+    '''
+
+    encoding = response.get('content-encoding', '').strip().lower()
+
+    if encoding in ('gzip', 'x-gzip'):
+        return gzip.GzipFile(fileobj=io.BytesIO(content))
+    elif encoding == 'deflate':
+        return DeflateReader(content)
+
+    return io.BytesIO(content)
+
+class DeflateReader(object):
+    '''
+    A file-like object that decompresses deflate content as it's read. Servers
+    send deflate both with and without the zlib wrapper, so both are accepted.
+    '''
+
+    def __init__(self, content):
+        self._source = io.BytesIO(content)
+        self._decompressor = None
+        self._buffer = b''
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            if not self._decode():
+                break
+
+        if size < 0:
+            size = len(self._buffer)
+
+        data = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return data
+
+    def _decode(self):
+        if self._decompressor is not None and self._decompressor.unconsumed_tail:
+            chunk = self._decompressor.unconsumed_tail
+        else:
+            chunk = self._source.read(DECODE_CHUNK_SIZE)
+
+        if not chunk:
+            if self._decompressor is not None:
+                self._buffer += self._decompressor.flush()
+                self._decompressor = None
+            return False
+
+        if self._decompressor is None:
+            self._decompressor = zlib.decompressobj()
+
+            try:
+                self._buffer += self._decompressor.decompress(chunk, DECODE_CHUNK_SIZE)
+                return True
+            except zlib.error:
+                self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+
+        self._buffer += self._decompressor.decompress(chunk, DECODE_CHUNK_SIZE)
+        return True
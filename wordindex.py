@@ -0,0 +1,135 @@
+# Fiend - A Python module for accessing Zynga's Words with Friends
+# Copyright (C) 2011 Jahn Veach <j@hnvea.ch>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# An inverted index from each word that's been played to where it was played,
+# so questions like "which games had QI in them" are a dictionary lookup
+# rather than a walk over every move of every game. The index is kept up to
+# date as moves are added to games, and can be saved and loaded again.
+
+import pickle
+import sys
+from array import array
+from collector import MoveCollector
+
+try:
+    intern = sys.intern
+except AttributeError:
+    pass
+
+# Each posting is a game ID, a move index, the ID of the user who played the
+# move, and the move's points, stored one after another in a word's array.
+POSTING_SIZE = 4
+
+class WordIndex(MoveCollector):
+    def __init__(self):
+        MoveCollector.__init__(self)
+
+        self._postings = {}
+
+    def __len__(self):
+        return len(self._postings)
+
+    def __contains__(self, word):
+        return normalizeWord(word) in self._postings
+
+    def __iter__(self):
+        return iter(self._postings)
+
+    def _collect(self, game, move):
+        for word in move.words:
+            word = intern(normalizeWord(word))
+
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = array('l')
+
+            postings.extend((game.id, move.moveIndex, move.userId, move.score or 0))
+
+    def lookup(self, word):
+        '''
+        Returns a list of (gameId, moveIndex, userId, points) tuples, one for
+        each time the word was played, in the order they were added.
+        '''
+
+        postings = self._postings.get(normalizeWord(word), ())
+        return [tuple(postings[i:i + POSTING_SIZE]) for i in range(0, len(postings), POSTING_SIZE)]
+
+    def count(self, word, userId=None):
+        '''
+        Returns the number of times a word was played, by the given user if
+        userId is given.
+        '''
+
+        postings = self._postings.get(normalizeWord(word), ())
+
+        if userId is None:
+            return len(postings) // POSTING_SIZE
+
+        return postings[2::POSTING_SIZE].count(userId)
+
+    def games(self, word):
+        '''
+        Returns a sorted list of the IDs of the games that a word was played in.
+        '''
+
+        return sorted(set(self._postings.get(normalizeWord(word), ())[0::POSTING_SIZE]))
+
+    def mostCommon(self, num=10, userId=None):
+        '''
+        Returns a list of up to num (word, count) pairs for the most played
+        words, most played first. Only the given user's words are counted if
+        userId is given.
+        '''
+
+        counts = [(word, self.count(word, userId)) for word in self._postings]
+        counts.sort(key=lambda wordCount: (-wordCount[1], wordCount[0]))
+        return [wordCount for wordCount in counts[:num] if wordCount[1] > 0]
+
+    def save(self, path):
+        '''
+        Saves the index to a file, which load() can read back.
+        '''
+
+        with open(path, 'wb') as indexFile:
+            pickle.dump((self._postings, self._numMoves), indexFile, 2)
+
+    @classmethod
+    def load(cls, path):
+        '''
+        Returns the WordIndex saved in a file by save().
+        '''
+
+        with open(path, 'rb') as indexFile:
+            postings, numMoves = pickle.load(indexFile)
+
+        wordIndex = cls()
+        wordIndex._postings = dict([(intern(word), postings) for word, postings in postings.items()])
+        wordIndex._numMoves = numMoves
+        return wordIndex
+
+def normalizeWord(word):
+    '''
+    Returns a word in the form it's indexed by, which is upper case.
+    '''
+
+    return str(word).upper()